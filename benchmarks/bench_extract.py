@@ -0,0 +1,122 @@
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Micro-benchmark for extract_travel_details: checks the precompiled extractor gives
+# exactly the results of the original per-pattern re.search loop on a regression
+# corpus (both pattern sets), then compares their throughput.
+#
+#   python benchmarks/bench_extract.py --synthetic 20000 --repeat 5
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from travel_planner.extract import LOOSE_PATTERNS, PATTERNS, get_extractor  # noqa: E402
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "extract_corpus.txt")
+
+# Fragments for synthetic queries, including look-alike letters that IGNORECASE folds onto ASCII
+FRAGMENTS = [
+    "Plan a trip", "from London", "from New York", "to Rome", "to Paris", "in Tokyo", "to São Paulo",
+    "for 3 days", "for 1 day", "a 4-day", "for 10 days", "with a budget of 2000", "budget of 50",
+    "for leisure travel", "for business travel", "I prefer museums, food and walks", "prefer quiet",
+    "I love Italian food", "want to try Thai cuisine", "looking for a cozy stay", "want a luxury stay",
+    "and", "with", "the", "a", ".", ",", "\n", "ſtay", "Trıp", "DAYS", "TO BERLIN", "K", "K",
+]
+
+FILLER = [
+    "hi", "hello", "we are two adults", "with my family", "next summer", "please", "somewhere warm",
+    "thanks", "what do you suggest", "ideally", "not too expensive", "kids are 5 and 8", "by train",
+    "in June", "near the sea", "something relaxing", "lots of hiking", "good nightlife",
+]
+
+# The extractor as it was before precompilation: one re.search per pattern on every call
+def reference_extract(user_input, patterns):
+    details = {
+        "starting_city": None,
+        "destination": None,
+        "days": None,
+        "budget": None,
+        "purpose": None,
+        "preferences": None,
+        "dietary": None,
+        "accommodation": None
+    }
+
+    for key, pattern in patterns.items():
+        match = re.search(pattern, user_input, re.IGNORECASE)
+        if match:
+            details[key] = match.group(1).strip()
+
+    if details["days"]:
+        try:
+            details["days"] = int(details["days"])
+        except ValueError:
+            details["days"] = None
+
+    return details
+
+
+def load_corpus(path=CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f]
+
+
+# Function to build random queries: mostly filler, like real chat logs, with some of the fragments above
+def synthetic_queries(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(FRAGMENTS if rng.random() < 0.4 else FILLER) for _ in range(rng.randint(1, 40)))
+        for _ in range(count)
+    ]
+
+
+# Function to return the inputs where the extractor and the reference disagree
+def mismatches(queries, patterns):
+    extractor = get_extractor(patterns)
+    return [query for query in queries if extractor.extract(query) != reference_extract(query, patterns)]
+
+
+def throughput(fn, queries, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(queries)
+        best = min(best, time.perf_counter() - start)
+    return len(queries) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the precompiled travel-detail extractor with the original.")
+    parser.add_argument("--synthetic", type=int, default=20000, help="Random queries added to the corpus")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per extractor (best is reported)")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    synthetic = synthetic_queries(args.synthetic)
+    # The short hand-written queries are repeated to a comparable size for timing
+    datasets = {"corpus": corpus * max(1, args.synthetic // len(corpus)), "synthetic": synthetic}
+
+    failed = False
+    for name, patterns in (("planner", PATTERNS), ("loose", LOOSE_PATTERNS)):
+        different = mismatches(corpus + synthetic, patterns)
+        if different:
+            failed = True
+            print(f"{name}: {len(different)} mismatching inputs, e.g. {different[0]!r}")
+            continue
+        print(f"{name}: {len(corpus) + len(synthetic)} inputs identical")
+
+        extractor = get_extractor(patterns)
+        for dataset, queries in datasets.items():
+            before = throughput(lambda items: [reference_extract(item, patterns) for item in items], queries, args.repeat)
+            after = throughput(extractor.extract_batch, queries, args.repeat)
+            print(f"  {dataset:<10} {before:>10,.0f} -> {after:>10,.0f} inputs/s ({after / before:.1f}x)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
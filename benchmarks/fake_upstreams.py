@@ -0,0 +1,229 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-ins for every upstream API the apps call. Each fake runs on its own
+# port with configurable latency, error rate and payload size, and counts the
+# requests it receives so benchmarks can report upstream calls per request.
+
+# Real origins each fake replaces (fed to http_client.route_hosts)
+ORIGINS = {
+    "geocoding": ["https://geocoding-api.open-meteo.com"],
+    "overpass": ["https://overpass.kumi.systems", "http://overpass-api.de", "https://overpass-api.de"],
+    "openrouter": ["https://openrouter.ai"],
+    "huggingface": ["https://api-inference.huggingface.co"],
+    "google": ["https://www.googleapis.com"],
+    "wikivoyage": ["https://en.wikivoyage.org"],
+}
+
+# Default payload size per service: elements per category, words per completion,
+# search results, or characters of guide text
+DEFAULT_PAYLOAD = {
+    "geocoding": 1,
+    "overpass": 60,
+    "openrouter": 30,
+    "huggingface": 400,
+    "google": 5,
+    "wikivoyage": 20000,
+}
+
+WORDS = "museum river old town market view square tower garden street cafe bridge harbour hill quiet lively".split()
+
+
+class FakeConfig:
+    def __init__(self, latency=0.0, error_rate=0.0, payload=None, token_latency=0.0):
+        self.latency = latency  # Seconds added to every response (time to first byte)
+        self.error_rate = error_rate  # Fraction of requests answered with 503
+        self.payload = payload
+        self.token_latency = token_latency  # Seconds between streamed tokens
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+# Response builders: each takes (config, rng, parsed url, query params, JSON body)
+def geocoding_response(config, rng, url, params, body):
+    name = params.get("name", [""])[0]
+    seeded = random.Random(name.lower())
+    results = [
+        {"name": name, "latitude": round(seeded.uniform(-60, 60), 4), "longitude": round(seeded.uniform(-170, 170), 4)}
+        for _ in range(config.payload)
+    ]
+    return {"results": results}
+
+
+def overpass_response(config, rng, url, params, body):
+    query = params.get("data", [""])[0]
+    around = re.search(r"around:(\d+),\s*([-\d.]+),\s*([-\d.]+)", query)
+    radius, lat, lon = (float(g) for g in around.groups()) if around else (1000.0, 0.0, 0.0)
+    spread = min(radius / 111000.0, 0.5)
+
+    elements = []
+    node_id = 1
+    selectors = re.findall(r'node\["([^"]+)"="([^"]+)"\].*?out center (\d+);', query, re.S)
+    for key, value, limit in selectors:
+        for i in range(min(config.payload, int(limit))):
+            elements.append({
+                "type": "node",
+                "id": node_id,
+                "lat": lat + rng.uniform(-spread, spread),
+                "lon": lon + rng.uniform(-spread, spread),
+                "tags": {key: value, "name": f"{value.title()} {i + 1}"},
+            })
+            node_id += 1
+    return {"version": 0.6, "elements": elements}
+
+
+def openrouter_response(config, rng, url, params, body):
+    prompt = body["messages"][0]["content"]
+    if "JSON object" in prompt:
+        places = json.loads(prompt.rsplit("\n", 1)[-1])
+        content = json.dumps({place: words(rng, config.payload) for place in places})
+    else:
+        content = words(rng, config.payload)
+    return {"choices": [{"message": {"role": "assistant", "content": content}}]}
+
+
+def huggingface_response(config, rng, url, params, body):
+    return [{"generated_text": body.get("inputs", "") + "\n" + words(rng, config.payload)}]
+
+
+# Function to build the server-sent events of a streamed HuggingFace completion
+def huggingface_stream_events(config, rng, body):
+    tokens = [" " + word for word in words(rng, config.payload).split()]
+    events = [{"token": {"text": token, "special": False}, "generated_text": None} for token in tokens]
+    events[-1]["generated_text"] = "".join(tokens)
+    return events
+
+
+def google_response(config, rng, url, params, body):
+    return {"items": [{"snippet": words(rng, 25)} for _ in range(config.payload)]}
+
+
+def wikivoyage_response(config, rng, url, params, body):
+    title = params.get("titles", [""])[0]
+    extract = (f"<p>{title} is a destination. " + words(rng, config.payload // 6))[:config.payload]
+    if params.get("exchars"):  # Like TextExtracts, return only the requested number of characters
+        extract = extract[:int(params["exchars"][0])]
+    return {"query": {"pages": {"1": {"pageid": 1, "title": title, "extract": extract}}}}
+
+
+BUILDERS = {
+    "geocoding": geocoding_response,
+    "overpass": overpass_response,
+    "openrouter": openrouter_response,
+    "huggingface": huggingface_response,
+    "google": google_response,
+    "wikivoyage": wikivoyage_response,
+}
+
+
+class FakeUpstream:
+    def __init__(self, service, config):
+        self.service = service
+        self.config = config
+        self.calls = 0
+        self.errors = 0
+        self._lock = threading.Lock()
+        self._rng = random.Random(service)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, so connection pooling shows up in the numbers
+
+            def log_message(self, format, *args):
+                pass
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+            def _stream(self, rng, body):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for event in huggingface_stream_events(fake.config, rng, body):
+                    self._write_chunk(f"data:{json.dumps(event)}\n\n".encode("utf-8"))
+                    if fake.config.token_latency:
+                        time.sleep(fake.config.token_latency)
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _respond(self, body):
+                with fake._lock:
+                    fake.calls += 1
+                    failed = fake._rng.random() < fake.config.error_rate
+                    fake.errors += failed
+                    rng = random.Random(fake._rng.random())
+                if fake.config.latency:
+                    time.sleep(fake.config.latency)
+
+                if not failed and fake.service == "huggingface" and body.get("stream"):
+                    self._stream(rng, body)
+                    return
+                if fake.config.token_latency and not failed:
+                    time.sleep(fake.config.token_latency * fake.config.payload)  # Whole completion generated up front
+                if failed:
+                    status, payload = 503, {"error": "Service unavailable (injected)"}
+                else:
+                    url = urlparse(self.path)
+                    status = 200
+                    payload = BUILDERS[fake.service](fake.config, rng, url, parse_qs(url.query), body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._respond({})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self._respond(json.loads(self.rfile.read(length) or b"{}"))
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = 0
+            self.errors = 0
+
+
+# Function to start one fake per service; `configs` maps service -> FakeConfig
+def start_fakes(configs=None):
+    fakes = {}
+    for service in BUILDERS:
+        config = (configs or {}).get(service) or FakeConfig()
+        if config.payload is None:
+            config.payload = DEFAULT_PAYLOAD[service]
+        fakes[service] = FakeUpstream(service, config).start()
+    return fakes
+
+
+# Function to map every real upstream origin onto its local fake
+def origin_overrides(fakes):
+    return {origin: fakes[service].base_url for service, origins in ORIGINS.items() for origin in origins}
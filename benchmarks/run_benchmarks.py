@@ -0,0 +1,243 @@
+import argparse
+import asyncio
+import importlib.util
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Offline end-to-end benchmark: starts local fakes for every upstream API, routes the
+# shared HTTP client to them and drives each app's itinerary pipeline through the
+# travel_planner engine (with that app's options), reporting
+# latency percentiles, throughput and upstream calls per request.
+#
+#   python benchmarks/run_benchmarks.py --requests 50 --concurrency 8 --latency openrouter=0.8
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+PIPELINES = ("planner", "Test", "testapi", "testing", "testapi_stream", "testing_stream")
+
+
+# Function to import a Streamlit front end in bare mode (widgets return their defaults, buttons are False),
+# to read the engine options it passes
+def load_app(name):
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", os.path.join(ROOT, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Function to consume a streamed completion and return its time to first chunk
+def time_to_first_chunk(chunks, start):
+    first = None
+    for _ in chunks:
+        if first is None:
+            first = time.perf_counter() - start
+    return first
+
+
+# Function to build the callable that runs one request through an app's pipeline.
+# Free-text extraction is timed too, but the structured destination is used for the
+# lookups so every app sees the same set of cities. Streaming pipelines return
+# their time to first chunk.
+def make_pipeline(name):
+    from travel_planner import ai_itinerary, chat, content, extract, itinerary, pipeline, places
+
+    if name == "planner":
+        # The planner renders from the async pipeline; its first chunk is the hotels and restaurants
+        async def stream(request, start):
+            first = None
+            async for _ in pipeline.stream_trip(request["destination"], request["days"]):
+                if first is None:
+                    first = time.perf_counter() - start
+            return first
+
+        def run(request):
+            start = time.perf_counter()
+            extract.extract_travel_details(request["text"])
+            return asyncio.run(stream(request, start))
+    elif name == "Test":
+        app = load_app(name)
+        patterns = getattr(app, "TRAVEL_PATTERNS", extract.PATTERNS)
+        place_options = getattr(app, "PLACE_OPTIONS", {})
+        describe = getattr(app, "DESCRIBE_ATTRACTIONS", True)
+
+        def run(request):
+            extract.extract_travel_details(request["text"], patterns)
+            elements = places.get_place_elements(
+                request["destination"],
+                ["tourism=hotel", "amenity=restaurant", "tourism=attraction"],
+                {"tourism=attraction": places.ATTRACTION_CANDIDATES},
+                **place_options,
+            )
+            places.place_names(elements["tourism=hotel"])
+            places.place_names(elements["amenity=restaurant"])
+            itinerary.generate_itinerary(request["destination"], request["days"], elements["tourism=attraction"], describe=describe)
+    elif name == "testapi":
+        def run(request):
+            guide = content.get_travel_guide(request["destination"])
+            ai_itinerary.generate_itinerary(
+                request["destination"], "Mid-range", request["days"], "Leisure", "",
+                "No Preference", "Moderate", "Mid-range", guide,
+            )
+    elif name == "testapi_stream":
+        def run(request):
+            start = time.perf_counter()
+            guide = content.get_travel_guide(request["destination"])
+            return time_to_first_chunk(ai_itinerary.stream_itinerary(
+                request["destination"], "Mid-range", request["days"], "Leisure", "",
+                "No Preference", "Moderate", "Mid-range", guide,
+            ), start)
+    elif name == "testing_stream":
+        def run(request):
+            return time_to_first_chunk(chat.stream_final_itinerary(), time.perf_counter())
+    else:
+        def run(request):
+            chat.generate_final_itinerary()
+    return run
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def run_pipeline(name, run, requests, concurrency, fakes):
+    for fake in fakes.values():
+        fake.reset_counters()
+
+    latencies = []
+    first_chunks = []
+
+    def timed(request):
+        start = time.perf_counter()
+        first_chunk = run(request)
+        latencies.append(time.perf_counter() - start)
+        if first_chunk is not None:
+            first_chunks.append(first_chunk)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, requests))
+    elapsed = time.perf_counter() - start
+
+    result = {
+        "pipeline": name,
+        "requests": len(requests),
+        "concurrency": concurrency,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_rps": len(requests) / elapsed,
+        "upstream_calls_per_request": {
+            service: fake.calls / len(requests) for service, fake in fakes.items() if fake.calls
+        },
+        "upstream_errors": {service: fake.errors for service, fake in fakes.items() if fake.errors},
+    }
+    if first_chunks:
+        result["ttft_p50_ms"] = percentile(first_chunks, 50) * 1000
+        result["ttft_p95_ms"] = percentile(first_chunks, 95) * 1000
+    return result
+
+
+def parse_service_values(pairs, cast):
+    values = {}
+    for pair in pairs or []:
+        service, value = pair.split("=", 1)
+        values[service] = cast(value)
+    return values
+
+
+def print_report(results):
+    print(f"{'pipeline':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ttft ms':>10}{'req/s':>10}  upstream calls per request")
+    for result in results:
+        calls = ", ".join(f"{service}={count:.2f}" for service, count in result["upstream_calls_per_request"].items())
+        ttft = f"{result['ttft_p50_ms']:.1f}" if "ttft_p50_ms" in result else "-"
+        print(
+            f"{result['pipeline']:<16}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}"
+            f"{result['p99_ms']:>10.1f}{ttft:>10}{result['throughput_rps']:>10.2f}  {calls}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the travel planner apps against local fake upstreams.")
+    parser.add_argument("--pipelines", default=",".join(PIPELINES), help="Comma-separated apps to drive")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per pipeline")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    parser.add_argument("--destinations", type=int, default=0,
+                        help="Distinct destinations to cycle through (default: one per request, i.e. cold caches)")
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--latency", action="append", metavar="SERVICE=SECONDS", help="Added latency per fake")
+    parser.add_argument("--error-rate", action="append", metavar="SERVICE=FRACTION", help="Injected 503 rate per fake")
+    parser.add_argument("--payload", action="append", metavar="SERVICE=SIZE", help="Payload size per fake")
+    parser.add_argument("--token-latency", action="append", metavar="SERVICE=SECONDS",
+                        help="Delay between streamed tokens per fake")
+    parser.add_argument("--json", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    # Isolate the persistent caches from any real cache before the apps import them
+    cache_dir = tempfile.mkdtemp(prefix="travel-bench-")
+    os.environ["TRAVEL_PLANNER_CACHE"] = os.path.join(cache_dir, "cache.sqlite3")
+    os.environ.pop("POI_INDEX_PATH", None)
+    # The fakes accept any key, and real ones should not be sent to them
+    for name in ("OPENROUTER_API_KEY", "HUGGINGFACE_API_KEY", "GOOGLE_CSE_ID", "GOOGLE_API_KEY"):
+        os.environ[name] = "benchmark"
+
+    from travel_planner import http_client
+    from travel_planner.cache import description_cache, geocode_cache, guide_cache, places_cache, search_cache
+    from travel_planner.resilience import reset_breakers
+    from fake_upstreams import FakeConfig, origin_overrides, start_fakes
+
+    latency = parse_service_values(args.latency, float)
+    error_rate = parse_service_values(args.error_rate, float)
+    payload = parse_service_values(args.payload, int)
+    token_latency = parse_service_values(args.token_latency, float)
+    configs = {
+        service: FakeConfig(
+            latency.get(service, 0.0), error_rate.get(service, 0.0), payload.get(service), token_latency.get(service, 0.0)
+        )
+        for service in set(latency) | set(error_rate) | set(payload) | set(token_latency)
+    }
+    fakes = start_fakes(configs)
+    http_client.route_hosts(origin_overrides(fakes))
+    http_client.configure(pool_maxsize=max(args.concurrency * 2, 10), retries=0)
+
+    destinations = args.destinations or args.requests
+    requests = [
+        {
+            "destination": f"City{i % destinations}",
+            "days": args.days,
+            "text": f"Plan a trip from London to City{i % destinations} for {args.days} days with a budget of 2000",
+        }
+        for i in range(args.requests)
+    ]
+
+    results = []
+    try:
+        for name in args.pipelines.split(","):
+            run = make_pipeline(name)
+            geocode_cache.clear()
+            description_cache.clear()
+            places_cache.clear()
+            guide_cache.clear()
+            search_cache.clear()
+            reset_breakers()
+            results.append(run_pipeline(name, run, requests, args.concurrency, fakes))
+    finally:
+        for fake in fakes.values():
+            fake.stop()
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
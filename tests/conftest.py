@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Run from anywhere (`pytest tests` or `python -m pytest`): import the package from the repo,
+# and keep the shared caches out of the real .cache directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("TRAVEL_PLANNER_CACHE", os.path.join(tempfile.mkdtemp(), "travel_cache.sqlite3"))
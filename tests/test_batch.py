@@ -0,0 +1,56 @@
+import json
+
+import pytest
+import requests
+
+from travel_planner import batch, config, http_client
+from travel_planner.cache import geocode_cache
+from travel_planner.descriptions import DESCRIPTION_ERROR
+
+ATTRACTIONS = [
+    {"type": "node", "id": i, "lat": 41.89 + i / 1000, "lon": 12.49, "tags": {"name": f"Batch Sight {i}"}}
+    for i in range(3)
+]
+
+
+def test_place_errors():
+    assert batch.place_error_status("Rome", "❌ No matching places found.") == "error"
+
+    geocode_cache.set("atlantis", None)  # The geocoder answered that it does not exist
+    assert batch.place_error_status("Atlantis", "❌ Location not found. Try another city.") == "error"
+    # Nothing cached: the geocoder could not be reached, so try again next run
+    assert batch.place_error_status("Lemuria", "❌ Location not found. Try another city.") == "failed"
+
+
+@pytest.mark.parametrize("error, permanent", [
+    ("Error: AI model not found. Check the model URL.", True),
+    ("Unexpected response format: []", True),
+    ("Error: 400 - bad request", True),
+    ("Error: 404 - missing", True),
+    ("Error: 403 - rate limited", False),
+    ("Error: 408 - request timeout", False),
+    ("Error: 429 - too many requests", False),
+    ("Error: 503 - model loading", False),
+    ("API Request failed: connection reset", False),
+])
+def test_ai_errors(error, permanent):
+    assert bool(batch.PERMANENT_AI_ERRORS.match(error)) == permanent
+
+
+def test_failed_descriptions_are_retried_on_resume(tmp_path, monkeypatch):
+    def unreachable(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("OpenRouter down")
+
+    monkeypatch.setattr(config, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(http_client, "post", unreachable)
+    monkeypatch.setattr(batch, "get_place_elements", lambda city, place_types, limits: {
+        "tourism=hotel": [], "amenity=restaurant": [], "tourism=attraction": ATTRACTIONS,
+    })
+
+    result = batch.plan_request({"destination": "Rome", "days": 1})
+    assert result["status"] == "failed"
+    assert result["itinerary"]["Day 1"][0].endswith(DESCRIPTION_ERROR)
+
+    output = tmp_path / "itineraries.jsonl"
+    output.write_text(json.dumps({"id": "rome", **result}) + "\n", encoding="utf-8")
+    assert batch.load_checkpoint(str(output)) == set()
@@ -0,0 +1,50 @@
+import numpy as np
+
+from travel_planner.bundles import pack_strings, read_bundle, unpack_strings, write_bundle
+from travel_planner.poi import NO_MATCHES
+
+HEADER = {"city": "Rome", "lat": 41.9, "lon": 12.5, "built_at": 0, "categories": {}}
+
+
+def test_strings_round_trip():
+    for strings in (["Colosseum", "", "Trevi – Fontana"], []):
+        assert unpack_strings(*pack_strings(strings)) == strings
+
+
+def test_arrays_round_trip_including_empty_ones(tmp_path):
+    path = str(tmp_path / "rome.bundle")
+    arrays = {
+        "ids": np.array([1, 2, 3], dtype=np.int64),
+        "empty_first": np.empty(0, dtype=np.float64),
+        "lat": np.array([41.89, 41.9, 41.91]),
+        "odd": np.array([1, 2, 3], dtype=np.int8),  # Leaves the next array to be aligned
+        "name_offsets": np.array([0], dtype=np.int64),
+        "empty_last": np.empty(0, dtype=np.uint8),
+    }
+    write_bundle(path, HEADER, arrays)
+
+    bundle = read_bundle(path)
+    assert bundle.city == "Rome" and bundle.lat == 41.9
+    for name, array in arrays.items():
+        stored = bundle.array(name)
+        assert stored.dtype == array.dtype
+        assert np.array_equal(stored, array)
+    assert bundle.all_descriptions() == {}
+
+
+def test_categories_read_back_as_pois(tmp_path):
+    path = str(tmp_path / "rome.bundle")
+    arrays = {}
+    for place_type, ids, names in (("tourism=attraction", [7, 8], ["Colosseum", ""]), ("amenity=restaurant", [], [])):
+        arrays[f"{place_type}/ids"] = np.array(ids, dtype=np.int64)
+        arrays[f"{place_type}/lat"] = np.array([41.89, 41.9][:len(ids)])
+        arrays[f"{place_type}/lon"] = np.array([12.49, 12.5][:len(ids)])
+        arrays[f"{place_type}/name_blob"], arrays[f"{place_type}/name_offsets"] = pack_strings(names)
+    write_bundle(path, HEADER, arrays)
+
+    bundle = read_bundle(path)
+    attractions = bundle.pois("tourism=attraction")
+    assert attractions.ids.tolist() == [7, 8]
+    assert attractions.names() == ["Colosseum", "Unnamed Location"]
+    assert attractions[0].tags == {"tourism": "attraction", "name": "Colosseum"}
+    assert bundle.pois("amenity=restaurant").names() == [NO_MATCHES]
@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+from travel_planner import cache as cache_module
+from travel_planner.cache import MISSING, PersistentCache, normalize_city
+
+
+# Stand-in for the time module inside cache.py, so expiry doesn't depend on how long SQLite takes
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+def test_values_survive_a_restart(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    PersistentCache("geocode", ttl=60, path=path).set("rome", [41.9, 12.5])
+    assert PersistentCache("geocode", ttl=60, path=path).get("rome") == [41.9, 12.5]
+    assert PersistentCache("other", ttl=60, path=path).get("rome") is MISSING
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = PersistentCache("geocode", ttl=60, path=path)
+    cache.set("rome", [41.9, 12.5])
+    clock.now += 59
+    assert cache.get("rome") == [41.9, 12.5]
+    assert PersistentCache("geocode", ttl=60, path=path).get("rome") == [41.9, 12.5]
+    clock.now += 1
+    assert cache.get("rome") is MISSING
+    assert PersistentCache("geocode", ttl=60, path=path).get("rome", "default") == "default"
+
+
+def test_negative_entries_use_their_own_ttl(tmp_path, clock):
+    cache = PersistentCache("geocode", ttl=60, negative_ttl=10, path=str(tmp_path / "cache.sqlite3"))
+    cache.set("atlantis", None)
+    cache.set("rome", [41.9, 12.5])
+    assert cache.get("atlantis") is None  # A cached "not found", not a miss
+    clock.now += 10
+    assert cache.get("atlantis") is MISSING
+    assert cache.get("rome") == [41.9, 12.5]
+
+
+def test_capped_namespace_keeps_the_most_recently_used(tmp_path, clock):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = PersistentCache("description", ttl=60, max_entries=3, evict_slack=1, path=path)
+    for i in range(6):
+        cache.set(f"place {i}", f"description {i}")
+        clock.now += 1
+
+    with sqlite3.connect(path) as db:
+        keys = {row[0] for row in db.execute("SELECT key FROM cache WHERE namespace = 'description'")}
+    assert len(keys) <= 3 + 1
+    assert {"place 3", "place 4", "place 5"} <= keys
+
+
+def test_encode_and_decode_convert_values_on_disk(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    options = {"ttl": 60, "path": path, "encode": sorted, "decode": set}
+    PersistentCache("tags", **options).set("rome", {"b", "a"})
+    assert PersistentCache("tags", **options).get("rome") == {"a", "b"}
+
+
+def test_normalize_city():
+    assert normalize_city("  São  PAULO ") == "sao paulo"
@@ -0,0 +1,35 @@
+import pytest
+
+from travel_planner import config, http_client
+from travel_planner.cache import MISSING, description_cache
+from travel_planner.descriptions import DESCRIPTION_ERROR, description_cache_key, generate_descriptions
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        if isinstance(self.body, Exception):
+            raise self.body
+        return self.body
+
+
+@pytest.mark.parametrize("body", [
+    {"choices": [{"message": {"content": None}}]},
+    {"choices": [{"message": {"content": "   "}}]},
+    {"error": {"message": "Provider returned error", "code": 502}},
+    {"choices": []},
+    [],
+    ValueError("not JSON"),
+], ids=["null content", "blank content", "error body", "no choices", "not an object", "not JSON"])
+def test_malformed_replies_fall_back_per_place(body, monkeypatch, request):
+    monkeypatch.setattr(config, "OPENROUTER_API_KEY", "test-key")
+    monkeypatch.setattr(http_client, "post", lambda *args, **kwargs: FakeResponse(body))
+    places = [f"{request.node.callspec.id} sight {i}" for i in range(2)]
+
+    assert generate_descriptions(places, city="Rome") == {place: DESCRIPTION_ERROR for place in places}
+    assert all(description_cache.get(description_cache_key(place, "Rome")) is MISSING for place in places)
@@ -0,0 +1,46 @@
+import requests
+
+from travel_planner import http_client, places
+from travel_planner.poi_index import POIIndex
+
+EXTRACT = """<?xml version="1.0" encoding="UTF-8"?>
+<osm version="0.6">
+  <node id="1" lat="41.8933" lon="12.4829">
+    <tag k="place" v="city"/><tag k="name" v="Roma"/><tag k="name:en" v="Rome"/><tag k="population" v="2,872,800"/>
+  </node>
+  <node id="2" lat="44.4906" lon="11.3427">
+    <tag k="place" v="town"/><tag k="name" v="Roma"/>
+  </node>
+  <node id="3" lat="41.9009" lon="12.4833"><tag k="tourism" v="hotel"/><tag k="name" v="Hotel Trevi"/></node>
+  <node id="4" lat="41.8902" lon="12.4922"><tag k="tourism" v="attraction"/><tag k="name" v="Colosseo"/></node>
+</osm>
+"""
+
+
+def build_index(tmp_path):
+    extract = tmp_path / "rome.osm"
+    extract.write_text(EXTRACT, encoding="utf-8")
+    path = str(tmp_path / "rome.npz")
+    POIIndex.from_osm(str(extract)).save(path)
+    return path
+
+
+def test_gazetteer_round_trip(tmp_path):
+    index = POIIndex.load(build_index(tmp_path))
+    assert index.locate("  ROME ") == (41.8933, 12.4829)
+    assert index.locate("Roma") == (41.8933, 12.4829)  # The city wins over the town of the same name
+    assert index.locate("Paris") is None
+    assert [element["tags"]["name"] for element in index.query_radius("tourism=hotel", 41.8933, 12.4829, 2000)] == ["Hotel Trevi"]
+
+
+def test_cities_in_the_index_need_no_network(tmp_path, monkeypatch):
+    def offline(*args, **kwargs):
+        raise requests.exceptions.ConnectionError("no network")
+
+    path = build_index(tmp_path)
+    monkeypatch.setattr(places, "POI_INDEX_PATH", path)
+    monkeypatch.setattr(http_client, "get", offline)
+
+    assert places.get_coordinates("Rome") == (41.8933, 12.4829)
+    attractions = places.get_place_elements("Rome", ["tourism=attraction"])["tourism=attraction"]
+    assert attractions.names() == ["Colosseo"]
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from travel_planner.ratelimit import AdaptiveLimiter, TokenBucket
+
+
+def test_bucket_serves_waiters_in_arrival_order():
+    bucket = TokenBucket(rate=20, burst=1)
+    assert bucket.acquire()
+    finished = []
+
+    def take(name):
+        bucket.acquire()
+        finished.append(name)
+
+    first = threading.Thread(target=take, args=("first",))
+    second = threading.Thread(target=take, args=("second",))
+    first.start()
+    time.sleep(0.01)
+    second.start()
+    first.join(5)
+    second.join(5)
+    assert finished == ["first", "second"]
+
+
+def test_bucket_gives_up_without_taking_tokens_past_the_deadline():
+    bucket = TokenBucket(rate=20, burst=1)
+    assert bucket.acquire()
+    started = time.monotonic()
+    assert not bucket.acquire(timeout=0.01)
+    assert time.monotonic() - started < 0.05  # Refused up front rather than after sleeping
+    time.sleep(0.06)
+    assert bucket.try_acquire()  # The refused call left the refill untouched
+
+
+def test_limit_grows_when_calls_were_held_back():
+    limiter = AdaptiveLimiter("model", initial=2, maximum=4)
+    started = time.monotonic()
+    assert limiter.acquire() and limiter.acquire()
+    limiter.release(started, 0.1)
+    assert limiter.limit == 2.5
+    limiter.release(started, 0.1)
+    assert limiter.limit == 2.5  # Below the limit: nothing was held back
+
+
+def test_limit_halves_once_per_burst_of_overload():
+    limiter = AdaptiveLimiter("model", initial=8)
+    started = time.monotonic()
+    assert limiter.acquire() and limiter.acquire()
+    limiter.release(started, overloaded=True)
+    limiter.release(started, overloaded=True)  # Sent before the decrease
+    assert limiter.limit == 4
+
+    assert limiter.acquire()
+    limiter.release(time.monotonic(), overloaded=True)
+    assert limiter.limit == 2
+
+
+def test_slow_answers_are_overload_only_with_a_latency_target():
+    limiter = AdaptiveLimiter("model", initial=4, latency_target=0)
+    assert limiter.acquire()
+    limiter.release(time.monotonic(), latency=60)
+    assert limiter.limit == 4
+
+    limiter = AdaptiveLimiter("model", initial=4, latency_target=1)
+    assert limiter.acquire()
+    limiter.release(time.monotonic(), latency=2)
+    assert limiter.limit == 2
+
+
+def test_acquire_respects_the_deadline_and_retry_after():
+    limiter = AdaptiveLimiter("model", initial=1)
+    assert limiter.acquire()
+    assert not limiter.acquire(deadline=time.monotonic() + 0.02)  # No free slot
+
+    limiter.release(time.monotonic(), retry_after=60)
+    assert not limiter.acquire(deadline=time.monotonic() + 1)  # Paused past the deadline
@@ -0,0 +1,43 @@
+import time
+
+from travel_planner.resilience import CircuitBreaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("mirror", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("mirror", failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("mirror", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert breaker.allow()  # The probe
+    assert not breaker.allow()  # Everyone else waits for it
+    assert breaker.state == "open"
+
+
+def test_probe_outcome_closes_or_reopens_the_circuit():
+    breaker = CircuitBreaker("mirror", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
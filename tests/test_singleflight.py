@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from travel_planner.singleflight import SingleFlight, SingleFlightTimeout
+
+
+# Function to run group.do(key, fn) from several threads at once; returns each thread's result or exception
+def run_concurrently(group, fn, callers=5):
+    outcomes = [None] * callers
+
+    def call(i):
+        try:
+            outcomes[i] = group.do("key", fn)
+        except Exception as e:
+            outcomes[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+
+def test_waiters_share_the_leaders_result():
+    group, release, calls = SingleFlight(), threading.Event(), []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return {"lat": 41.9}
+
+    threads, outcomes = run_concurrently(group, fetch)
+    time.sleep(0.1)  # Let every caller join the in-flight call
+    assert group.in_flight() == 1
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+    assert group.in_flight() == 0
+
+
+def test_waiters_share_the_leaders_exception():
+    group, release, calls = SingleFlight(), threading.Event(), []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        raise ValueError("upstream down")
+
+    threads, outcomes = run_concurrently(group, fetch)
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert isinstance(outcomes[0], ValueError)
+    assert all(outcome is outcomes[0] for outcome in outcomes)
+
+
+def test_later_calls_start_a_fresh_flight():
+    group = SingleFlight()
+    assert group.do("key", lambda: 1) == 1
+    assert group.do("key", lambda: 2) == 2
+
+
+def test_waiter_gives_up_after_timeout():
+    group, release = SingleFlight(), threading.Event()
+    leader = threading.Thread(target=group.do, args=("key", lambda: release.wait(5)))
+    leader.start()
+    time.sleep(0.05)
+    with pytest.raises(SingleFlightTimeout):
+        group.do("key", lambda: None, timeout=0.05)
+    release.set()
+    leader.join(5)
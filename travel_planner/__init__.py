@@ -0,0 +1,52 @@
+import importlib
+
+# The travel planning engine, importable without Streamlit. Submodules (and the
+# NumPy/requests stacks behind them) load on first attribute access, so
+# `import travel_planner` stays cheap for workers and batch jobs:
+#
+#   import travel_planner
+#   details = travel_planner.extract_travel_details("Plan a trip to Rome for 3 days")
+#   itinerary = travel_planner.generate_itinerary(details["destination"], details["days"])
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "extract_travel_details": "extract",
+    "extract_travel_details_batch": "extract",
+    "TravelExtractor": "extract",
+    "get_coordinates": "places",
+    "get_place_elements": "places",
+    "get_places": "places",
+    "get_places_multi": "places",
+    "place_names": "places",
+    "POIs": "poi",
+    "generate_description": "descriptions",
+    "generate_descriptions": "descriptions",
+    "generate_itinerary": "itinerary",
+    "stream_trip": "pipeline",
+    "plan_trip": "pipeline",
+    "get_travel_guide": "content",
+    "google_search": "content",
+}
+
+_SUBMODULES = (
+    "ai_itinerary", "batch", "bundles", "cache", "chat", "config", "content", "descriptions", "extract",
+    "http_client", "itinerary", "llm_stream", "memory", "metrics", "overpass", "pipeline", "places", "poi",
+    "poi_index", "ratelimit", "resilience", "scheduler", "singleflight", "turns",
+)
+
+__all__ = sorted(_EXPORTS) + list(_SUBMODULES)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
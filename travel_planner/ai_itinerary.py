@@ -0,0 +1,78 @@
+import requests
+
+from . import config, http_client, metrics
+from .llm_stream import stream_huggingface
+
+# Free-form itineraries written by a HuggingFace model (testapi.py's engine)
+ITINERARY_MODEL_URL = "https://api-inference.huggingface.co/models/tiiuae/falcon-7b"
+ITINERARY_PARAMETERS = {
+    "max_length": 700,  # Allow detailed response
+    "temperature": 0.7,
+    "top_p": 0.9,
+}
+
+# Function to build the itinerary prompt
+def build_itinerary_prompt(destination, budget, duration, purpose, preferences, dietary_pref, activity_level, accommodation, travel_guide):
+    return f"""
+    Create a {duration}-day travel itinerary for {destination}.
+    - Budget: {budget}
+    - Purpose: {purpose}
+    - Preferences: {preferences if preferences else 'No specific preferences'}
+    - Dietary Preferences: {dietary_pref}
+    - Activity Level: {activity_level}
+    - Accommodation Type: {accommodation}
+    - Travel Guide Insights: {travel_guide}
+    Ensure:
+    - Logical activity flow with morning, afternoon, and evening plans.
+    - Meal recommendations.
+    - Activity recommendations based on budget and preferences.
+    - Offbeat or hidden gems for exploration.
+    """
+
+# Function to turn a failed HuggingFace response into a message for the user
+def itinerary_error(response):
+    if response.status_code == 403:
+        return "Error: Invalid API Key or rate limit exceeded."
+
+    elif response.status_code == 404:
+        return "Error: AI model not found. Try another model."
+
+    return f"Error: {response.status_code} - {response.text}"
+
+# Function to generate AI itinerary
+@metrics.timed("llm", op="itinerary")
+def generate_itinerary(destination, budget, duration, purpose, preferences, dietary_pref, activity_level, accommodation, travel_guide):
+    prompt = build_itinerary_prompt(destination, budget, duration, purpose, preferences, dietary_pref, activity_level, accommodation, travel_guide)
+
+    data = {
+        "inputs": prompt,
+        "parameters": ITINERARY_PARAMETERS
+    }
+
+    try:
+        headers = {"Authorization": f"Bearer {config.require('HUGGINGFACE_API_KEY')}"}
+        response = http_client.post(ITINERARY_MODEL_URL, headers=headers, json=data, timeout=http_client.GENERATION_TIMEOUT)
+
+        if response.status_code == 200:
+            result = response.json()
+            if isinstance(result, list) and "generated_text" in result[0]:
+                itinerary = result[0]["generated_text"].strip()
+                return itinerary if len(itinerary) > 50 else "Error: AI response too short. Try again."
+            return "Unexpected response format from API."
+
+        return itinerary_error(response)
+
+    except requests.exceptions.RequestException as e:
+        return f"API Request failed: {str(e)}"
+    except config.MissingAPIKey as e:
+        return f"Error: {e}"
+
+# Function to stream the AI itinerary, yielding text as the model produces it
+def stream_itinerary(destination, budget, duration, purpose, preferences, dietary_pref, activity_level, accommodation, travel_guide):
+    prompt = build_itinerary_prompt(destination, budget, duration, purpose, preferences, dietary_pref, activity_level, accommodation, travel_guide)
+    try:
+        yield from stream_huggingface(ITINERARY_MODEL_URL, config.require("HUGGINGFACE_API_KEY"), prompt, ITINERARY_PARAMETERS, on_error=itinerary_error)
+    except requests.exceptions.RequestException as e:
+        yield f"API Request failed: {str(e)}"
+    except config.MissingAPIKey as e:
+        yield f"Error: {e}"
@@ -0,0 +1,249 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import ai_itinerary, http_client, metrics
+from .cache import geocode_cache, normalize_city
+from .content import get_travel_guide
+from .descriptions import DESCRIPTION_ERROR
+from .extract import extract_travel_details
+from .itinerary import generate_itinerary
+from .places import ATTRACTION_CANDIDATES, get_place_elements, place_names
+
+# Offline batch generation: reads travel requests from JSONL, runs them through the
+# engine on a worker pool and appends one JSON result per line as each finishes.
+# Results already in the output file are skipped, so re-running the same command
+# after a crash resumes where it stopped.
+#
+#   python -m travel_planner.batch requests.jsonl itineraries.jsonl --workers 16 --rate-limit openrouter.ai=5
+#
+# Each request line is either free text, as typed into planner.py:
+#   {"id": "rome-3", "text": "Plan a trip from London to Rome for 3 days"}
+# or structured fields, as in testapi.py (missing ones take testapi's defaults):
+#   {"id": "rome-ai", "destination": "Rome", "duration": 3, "budget": "Luxury"}
+# Lines without an "id" are identified by their line number.
+
+DEFAULT_DAYS = 2  # Same fallback as planner.py when the request gives no day count
+MAX_PENDING_PER_WORKER = 4  # Requests queued ahead of the pool, so 50k-line inputs are streamed, not loaded
+
+# Defaults for structured requests, matching the widget defaults in testapi.py
+AI_DEFAULTS = {
+    "budget": "Economy",
+    "duration": 5,
+    "purpose": "Leisure",
+    "preferences": "",
+    "dietary_pref": "No Preference",
+    "activity_level": "Relaxing",
+    "accommodation": "Budget",
+}
+
+# Result statuses: "ok", "error" (a permanent failure, e.g. no destination or an unknown
+# city), "failed" (a transient one: upstream outage, 429/5xx, transport error or queue
+# timeout, including an itinerary with any stop left undescribed) and "exception" (the
+# request crashed). Only "ok" and "error" are skipped on
+# resume; "failed" and "exception" requests run again.
+DONE_STATUSES = ("ok", "error")
+
+# Planner errors that running again cannot fix
+PERMANENT_PLACE_ERRORS = ("❌ No matching places found.",)
+# AI itinerary errors that running again cannot fix: a missing model, a bad reply format
+# and 4xx answers other than 403 (which HuggingFace also sends when rate limited), 408 and 429
+PERMANENT_AI_ERRORS = re.compile(r"Error: AI model not found|Unexpected response|Error: 4(?!03|08|29)\d\d ")
+
+
+# Function to yield (request id, request) for every non-blank input line
+def read_requests(path):
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                request = {"_invalid": str(e)}
+            if not isinstance(request, dict):
+                request = {"_invalid": "Request is not a JSON object"}
+            yield str(request.get("id", line_number)), request
+
+
+# Function to read the ids already finished in an existing output file. A line cut off
+# by a crash is dropped from the file so new results start on a clean line.
+def load_checkpoint(path):
+    done = set()
+    if not os.path.exists(path):
+        return done
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        complete = data[:data.rfind(b"\n") + 1]
+        if len(complete) != len(data):
+            f.truncate(len(complete))
+
+    for line in complete.decode("utf-8").splitlines():
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if result.get("status") in DONE_STATUSES:
+            done.add(str(result["id"]))
+    return done
+
+
+# Function to tell a permanent planner error from a transient one. "Location not found" is
+# permanent only when the geocoder answered that the city does not exist (a cached negative
+# lookup); get_coordinates reports a geocoder outage the same way.
+def place_error_status(destination, error):
+    if error in PERMANENT_PLACE_ERRORS:
+        return "error"
+    if error.startswith("❌ Location not found") and geocode_cache.get(normalize_city(destination)) is None:
+        return "error"
+    return "failed"
+
+
+# Function to produce the planner.py result for a request: hotels, restaurants and a day-by-day plan
+def plan_request(request):
+    with metrics.span("extract"):
+        details = extract_travel_details(request.get("text", ""))
+    details.update({key: request[key] for key in details if request.get(key) is not None})
+    if not details["days"] and request.get("duration"):
+        details["days"] = request["duration"]
+    if not details["days"]:
+        details["days"] = DEFAULT_DAYS
+    if not details["destination"]:
+        return {"status": "error", "error": "🚨 Please provide a valid destination and number of days.", "details": details}
+
+    place_elements = get_place_elements(
+        details["destination"],
+        ["tourism=hotel", "amenity=restaurant", "tourism=attraction"],
+        {"tourism=attraction": ATTRACTION_CANDIDATES},
+    )
+    itinerary = generate_itinerary(details["destination"], int(details["days"]), place_elements["tourism=attraction"])
+    if "Error" in itinerary:
+        return {"status": place_error_status(details["destination"], itinerary["Error"]), "error": itinerary["Error"], "details": details}
+    # Descriptions that failed are not cached, so running the request again only fills the gaps
+    if any(stop.endswith(DESCRIPTION_ERROR) for stops in itinerary.values() for stop in stops):
+        return {"status": "failed", "error": "Some attraction descriptions could not be generated.", "details": details, "itinerary": itinerary}
+
+    return {
+        "status": "ok",
+        "details": details,
+        "hotels": place_names(place_elements["tourism=hotel"])[:5],
+        "restaurants": place_names(place_elements["amenity=restaurant"])[:5],
+        "itinerary": itinerary,
+    }
+
+
+# Function to produce the testapi.py result for a request: a free-form AI itinerary
+def ai_request(request):
+    destination = (request.get("destination") or "").strip()
+    if not destination:
+        return {"status": "error", "error": "Please enter a destination before generating an itinerary."}
+
+    fields = {key: request.get(key, default) for key, default in AI_DEFAULTS.items()}
+    travel_guide = get_travel_guide(destination)
+    itinerary = ai_itinerary.generate_itinerary(
+        destination, fields["budget"], fields["duration"], fields["purpose"], fields["preferences"],
+        fields["dietary_pref"], fields["activity_level"], fields["accommodation"], travel_guide,
+    )
+    # ai_itinerary.generate_itinerary reports failures as text; these are its error prefixes
+    if itinerary.startswith(("Error:", "API Request failed", "Unexpected response")):
+        return {"status": "error" if PERMANENT_AI_ERRORS.match(itinerary) else "failed", "error": itinerary}
+    return {"status": "ok", "destination": destination, **fields, "itinerary": itinerary}
+
+
+
+ENGINES = {"planner": plan_request, "ai": ai_request}
+
+
+# Function to run one request and never raise, so one bad line cannot stop the batch
+def run_request(request_id, request, engine):
+    start = time.perf_counter()
+    if "_invalid" in request:
+        result = {"status": "error", "error": f"Invalid request: {request['_invalid']}"}
+    else:
+        try:
+            result = ENGINES[engine](request)
+        except Exception as e:
+            print("Batch Error:", request_id, e, file=sys.stderr)  # Debugging
+            result = {"status": "exception", "error": f"{type(e).__name__}: {e}"}
+    return {"id": request_id, **result, "elapsed_s": round(time.perf_counter() - start, 3)}
+
+
+# Function to run every unfinished request in `input_path`, appending results to `output_path`.
+# Returns counts per status, plus "skipped" for requests finished by an earlier run.
+def run_batch(input_path, output_path, engine="planner", workers=8, progress_every=0):
+    done = load_checkpoint(output_path)
+    counts = {"skipped": 0}
+    max_pending = max(1, workers) * MAX_PENDING_PER_WORKER
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending = set()
+
+        def write_finished(finished):
+            for future in finished:
+                result = future.result()
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()  # Each finished line reaches the file before the next one is written
+                counts[result["status"]] = counts.get(result["status"], 0) + 1
+                written = sum(counts.values()) - counts["skipped"]
+                if progress_every and written % progress_every == 0:
+                    print(f"{written} requests finished", file=sys.stderr)
+
+        for request_id, request in read_requests(input_path):
+            if request_id in done:
+                counts["skipped"] += 1
+                continue
+            done.add(request_id)  # Duplicate ids in the input run once
+
+            if len(pending) >= max_pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                write_finished(finished)
+            pending.add(executor.submit(run_request, request_id, request, engine))
+
+        write_finished(wait(pending).done)
+
+    return counts
+
+
+def parse_rate_limits(pairs):
+    limits = {}
+    for pair in pairs or []:
+        host, rate = pair.split("=", 1)
+        limits[host] = float(rate)
+    return limits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate itineraries for a JSONL file of travel requests.")
+    parser.add_argument("input", help="JSONL file with one travel request per line")
+    parser.add_argument("output", help="JSONL file results are appended to; re-running resumes from it")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="planner",
+                        help="planner: places + scheduled itinerary (planner.py); ai: HuggingFace itinerary (testapi.py)")
+    parser.add_argument("--workers", type=int, default=8, help="Requests processed at once")
+    parser.add_argument("--rate-limit", action="append", metavar="HOST=RPS",
+                        help="Max requests per second to an upstream host across all workers, e.g. openrouter.ai=5")
+    parser.add_argument("--progress-every", type=int, default=100, help="Print progress every N results (0 to disable)")
+    parser.add_argument("--metrics-json", help="Record stage timings, upstream calls and cache hits, and write them to this file")
+    args = parser.parse_args()
+
+    if args.metrics_json:
+        metrics.enable()
+
+    http_client.set_rate_limits(parse_rate_limits(args.rate_limit))
+    http_client.configure(pool_maxsize=max(args.workers * 2, http_client.HTTP_POOL_MAXSIZE))
+
+    start = time.perf_counter()
+    counts = run_batch(args.input, args.output, args.engine, args.workers, args.progress_every)
+    summary = ", ".join(f"{status}={count}" for status, count in counts.items())
+    print(f"Finished in {time.perf_counter() - start:.1f}s: {summary}", file=sys.stderr)
+    if args.metrics_json:
+        with open(args.metrics_json, "w", encoding="utf-8") as f:
+            f.write(metrics.render_json())
+
+
+if __name__ == "__main__":
+    main()
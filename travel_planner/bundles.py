@@ -0,0 +1,292 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .cache import BUNDLE_DIR, DESCRIPTION_TTL, content_key, normalize_city
+from .descriptions import DESCRIPTION_MODEL, DESCRIPTION_PROMPT_HASH, generate_descriptions
+from .poi import POIs
+from .places import (
+    ATTRACTION_CANDIDATES, OVERPASS_TIMEOUT, OVERPASS_URL, PLACES_RADIUS, fetch_place_elements, get_coordinates, place_names,
+)
+
+# Precomputed destination bundles: one file per popular city holding its coordinates,
+# hotels, restaurants and attractions (ids, coordinates, names) and the attraction
+# descriptions. Files are memory-mapped on first use, so serving a bundled city costs
+# no upstream call and no parsing beyond a small JSON header. With BUNDLE_DIR set,
+# get_coordinates, get_place_elements and generate_descriptions look here first.
+#
+#   BUNDLE_DIR=.cache/bundles python -m travel_planner.bundles --file top_destinations.txt
+#
+# Re-running the job refreshes incrementally: a category is fetched again only when it
+# is older than BUNDLE_PLACES_TTL or was built with other search settings, and only
+# descriptions that are missing, expired or from another model/prompt are generated.
+#
+# File layout: MAGIC, header length (uint64), JSON header, then the arrays, each 8-byte
+# aligned, listed in the header as name -> [offset from the end of the header, dtype, count].
+
+MAGIC = b"TPBUNDL1"
+BUNDLE_PLACE_TYPES = ("tourism=hotel", "amenity=restaurant", "tourism=attraction")
+BUNDLE_LIMITS = {"tourism=hotel": 10, "amenity=restaurant": 10, "tourism=attraction": ATTRACTION_CANDIDATES}
+BUNDLE_PLACES_TTL = int(os.environ.get("BUNDLE_PLACES_TTL", 7 * 24 * 3600))
+BUNDLE_WORKERS = 4  # Cities refreshed at once by the job
+
+_loaded = {}  # path -> (mtime_ns, Bundle)
+_loaded_lock = threading.Lock()
+
+
+# Function to map a city to its bundle file ("São Paulo" -> "sao_paulo-1a2b3c4d.bundle")
+def bundle_path(city, directory=BUNDLE_DIR):
+    key = normalize_city(city)
+    slug = re.sub(r"[^a-z0-9]+", "_", key).strip("_")[:40]
+    return os.path.join(directory, f"{slug}-{content_key(key)[:8]}.bundle")
+
+
+def align(size):
+    return -(-size // 8) * 8
+
+
+# Function to pack strings as one UTF-8 blob plus offsets
+def pack_strings(strings):
+    encoded = [text.encode("utf-8") for text in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(text) for text in encoded])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(blob, offsets):
+    data = blob.tobytes()
+    return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+class Bundle:
+    def __init__(self, header, buffer, data_start):
+        self.header = header
+        self.data_start = data_start
+        self.city = header["city"]
+        self.lat = header["lat"]
+        self.lon = header["lon"]
+        self.built_at = header["built_at"]
+        self.categories = header["categories"]
+        self._buffer = buffer
+        self._pois = {}
+        self._descriptions = None
+
+    # Function to view a stored array without copying it out of the mapped file
+    def array(self, name):
+        offset, dtype, count = self.header["arrays"][name]
+        return np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=count, offset=self.data_start + offset)
+
+    # Whether the bundle can answer a lookup of this place type with these search settings
+    def serves(self, place_type, radius, limit):
+        meta = self.categories.get(place_type)
+        return meta is not None and meta["radius"] == radius and meta["limit"] >= limit
+
+    # Function to return a category as POIs whose ids and coordinates stay in the mapped file
+    # (tags hold the place type and name)
+    def pois(self, place_type):
+        if place_type not in self._pois:
+            names = unpack_strings(self.array(f"{place_type}/name_blob"), self.array(f"{place_type}/name_offsets"))
+            self._pois[place_type] = POIs.from_columns(
+                place_type, *(self.array(f"{place_type}/{field}") for field in ("ids", "lat", "lon")), names
+            )
+        return self._pois[place_type]
+
+    # Function to return {place: (description, described_at)} for every stored description
+    def all_descriptions(self):
+        if self._descriptions is None:
+            if "descriptions/described_at" not in self.header["arrays"]:
+                self._descriptions = {}
+            else:
+                places = unpack_strings(self.array("descriptions/place_blob"), self.array("descriptions/place_offsets"))
+                texts = unpack_strings(self.array("descriptions/text_blob"), self.array("descriptions/text_offsets"))
+                self._descriptions = dict(zip(places, zip(texts, self.array("descriptions/described_at").tolist())))
+        return self._descriptions
+
+    # Function to return the stored descriptions of `places` that are still usable: same model
+    # and prompt as now, and younger than DESCRIPTION_TTL
+    def descriptions_for(self, places, now=None):
+        if self.header.get("description_model") != DESCRIPTION_MODEL or self.header.get("description_prompt_hash") != DESCRIPTION_PROMPT_HASH:
+            return {}
+        now = time.time() if now is None else now
+        stored = self.all_descriptions()
+        return {
+            place: stored[place][0]
+            for place in places
+            if place in stored and now - stored[place][1] < DESCRIPTION_TTL
+        }
+
+
+# Function to read a bundle file, memory-mapped
+def read_bundle(path):
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError(f"{path} is not a destination bundle")
+    header_length = int.from_bytes(buffer[len(MAGIC):len(MAGIC) + 8], "little")
+    header = json.loads(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_length].decode("utf-8"))
+    return Bundle(header, buffer, align(len(MAGIC) + 8 + header_length))
+
+
+# Function to write a bundle atomically: readers keep their old mapping until they reload
+def write_bundle(path, header, arrays):
+    header = dict(header, arrays={})
+    layout, offset = [], 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        header["arrays"][name] = [offset, array.dtype.str, len(array)]
+        layout.append((offset, array))
+        offset += align(array.nbytes)
+
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    data_start = align(len(MAGIC) + 8 + len(encoded))
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC + len(encoded).to_bytes(8, "little") + encoded)
+        f.write(b"\0" * (data_start - f.tell()))
+        for array_offset, array in layout:
+            f.seek(data_start + array_offset)
+            f.write(array.tobytes())
+        f.truncate(data_start + offset)  # Covers trailing empty arrays too
+    os.replace(temp_path, path)
+
+
+# Function to get a city's bundle, or None. Bundles are loaded on first use and
+# reloaded when the file changes; a missing file costs one stat.
+def load_bundle(city, directory=BUNDLE_DIR):
+    if not directory:
+        return None
+    path = bundle_path(city, directory)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+    with _loaded_lock:
+        entry = _loaded.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+    try:
+        bundle = read_bundle(path)
+    except (OSError, ValueError) as e:
+        print("Bundle Error:", e)  # Debugging
+        return None
+    with _loaded_lock:
+        _loaded[path] = (mtime, bundle)
+    return bundle
+
+
+# Function to build or incrementally refresh a city's bundle; returns a report of what was
+# fetched, kept or failed
+def refresh_bundle(city, directory=BUNDLE_DIR, force=False, radius=PLACES_RADIUS, workers=8):
+    now = time.time()
+    path = bundle_path(city, directory)
+    old = None
+    if os.path.exists(path):
+        try:
+            old = read_bundle(path)
+        except (OSError, ValueError) as e:
+            print("Bundle Error:", e)  # Debugging
+
+    lat, lon = (old.lat, old.lon) if old is not None else get_coordinates(city)
+    if lat is None or lon is None:
+        return {"city": city, "status": "❌ Location not found."}
+
+    # Categories that are missing, expired or were built with other settings are fetched again
+    stale = [
+        place_type for place_type in BUNDLE_PLACE_TYPES
+        if force or old is None or not old.serves(place_type, radius, BUNDLE_LIMITS[place_type])
+        or now - old.categories[place_type]["fetched_at"] > BUNDLE_PLACES_TTL
+    ]
+    fetched = fetch_place_elements(city, stale, lat, lon, radius, BUNDLE_LIMITS, OVERPASS_URL, OVERPASS_TIMEOUT) if stale else {}
+
+    report = {"city": city, "status": "ok", "categories": {}}
+    categories, pois_by_type = {}, {}
+    for place_type in BUNDLE_PLACE_TYPES:
+        if place_type in fetched:
+            pois = fetched[place_type]
+            source_hash = content_key(list(zip(pois.ids.tolist(), pois.raw_names())))[:16]
+            changed = old is None or place_type not in old.categories or old.categories[place_type]["source_hash"] != source_hash
+            report["categories"][place_type] = "changed" if changed else "unchanged"
+            meta = {"fetched_at": now, "radius": radius, "limit": BUNDLE_LIMITS[place_type], "source_hash": source_hash}
+        elif old is not None and place_type in old.categories:
+            # Not due, or the fetch failed: keep what the bundle had
+            pois = old.pois(place_type)
+            report["categories"][place_type] = "failed, kept old" if place_type in stale else "kept"
+            meta = old.categories[place_type]
+        else:
+            report["categories"][place_type] = "failed"
+            continue
+        categories[place_type] = meta
+        pois_by_type[place_type] = pois
+
+    # Only descriptions that are missing, expired or from another model/prompt are generated
+    names = list(dict.fromkeys(place_names(pois_by_type.get("tourism=attraction", []))))
+    names = [name for name in names if not name.startswith("❌")]
+    kept = {} if force or old is None else old.descriptions_for(names, now)
+    described_at = {name: old.all_descriptions()[name][1] for name in kept}
+    missing = [name for name in names if name not in kept]
+    generated = generate_descriptions(missing, workers, city) if missing else {}
+    generated = {name: text for name, text in generated.items() if not text.startswith("⚠️")}  # Errors are retried next run
+    descriptions = {**kept, **generated}
+    described_at.update({name: now for name in generated})
+    report["descriptions"] = {"kept": len(kept), "generated": len(generated), "failed": len(missing) - len(generated)}
+
+    arrays = {}
+    for place_type, pois in pois_by_type.items():
+        arrays[f"{place_type}/ids"] = pois.ids
+        arrays[f"{place_type}/lat"] = pois.lat
+        arrays[f"{place_type}/lon"] = pois.lon
+        arrays[f"{place_type}/name_blob"], arrays[f"{place_type}/name_offsets"] = pack_strings(pois.raw_names())
+    places = list(descriptions)
+    arrays["descriptions/place_blob"], arrays["descriptions/place_offsets"] = pack_strings(places)
+    arrays["descriptions/text_blob"], arrays["descriptions/text_offsets"] = pack_strings([descriptions[place] for place in places])
+    arrays["descriptions/described_at"] = np.array([described_at[place] for place in places], dtype=np.float64)
+
+    header = {
+        "city": city,
+        "lat": lat,
+        "lon": lon,
+        "built_at": now,
+        "categories": categories,
+        "description_model": DESCRIPTION_MODEL,
+        "description_prompt_hash": DESCRIPTION_PROMPT_HASH,
+    }
+    write_bundle(path, header, arrays)
+    report["bytes"] = os.path.getsize(path)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh precomputed destination bundles.")
+    parser.add_argument("destinations", nargs="*", help="Cities to bundle")
+    parser.add_argument("--file", help="Text file with one city per line (blank lines and # comments ignored)")
+    parser.add_argument("--dir", default=BUNDLE_DIR, help="Bundle directory (default: BUNDLE_DIR)")
+    parser.add_argument("--workers", type=int, default=BUNDLE_WORKERS, help="Cities refreshed at once")
+    parser.add_argument("--force", action="store_true", help="Fetch everything again, ignoring TTLs")
+    args = parser.parse_args()
+
+    destinations = list(args.destinations)
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            destinations += [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+    if not args.dir:
+        parser.error("set BUNDLE_DIR or pass --dir")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        for report in executor.map(lambda city: refresh_bundle(city, args.dir, args.force), destinations):
+            print(json.dumps(report, ensure_ascii=False))
+    print(f"Refreshed {len(destinations)} bundles in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
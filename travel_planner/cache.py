@@ -0,0 +1,227 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from . import metrics
+
+# On-disk store shared by every app, next to the package (override with TRAVEL_PLANNER_CACHE)
+CACHE_PATH = os.environ.get(
+    "TRAVEL_PLANNER_CACHE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "travel_cache.sqlite3"),
+)
+
+# Precomputed destination bundles (see bundles.py); unset to always look cities up live
+BUNDLE_DIR = os.environ.get("BUNDLE_DIR")
+
+# Geocoding TTLs in seconds: cities don't move, unknown names are retried daily
+GEOCODE_TTL = int(os.environ.get("GEOCODE_CACHE_TTL", 30 * 24 * 3600))
+GEOCODE_NEGATIVE_TTL = int(os.environ.get("GEOCODE_CACHE_NEGATIVE_TTL", 24 * 3600))
+
+# AI description cache: long TTL, bounded number of rows on disk
+DESCRIPTION_TTL = int(os.environ.get("DESCRIPTION_CACHE_TTL", 90 * 24 * 3600))
+DESCRIPTION_MAX_ENTRIES = int(os.environ.get("DESCRIPTION_CACHE_MAX_ENTRIES", 100000))
+
+# Place lookups: fresh for a day, then served stale (while refreshed in the background) for up to 30 days
+PLACES_TTL = int(os.environ.get("PLACES_CACHE_TTL", 24 * 3600))
+PLACES_STALE_TTL = int(os.environ.get("PLACES_CACHE_STALE_TTL", 30 * 24 * 3600))
+
+# WikiVoyage guides change slowly; Google results are kept for a day to save search quota.
+# Both are capped in rows on disk (and guides in characters, see content.GUIDE_CHARS).
+GUIDE_TTL = int(os.environ.get("GUIDE_CACHE_TTL", 7 * 24 * 3600))
+GUIDE_NEGATIVE_TTL = int(os.environ.get("GUIDE_CACHE_NEGATIVE_TTL", 24 * 3600))
+SEARCH_TTL = int(os.environ.get("SEARCH_CACHE_TTL", 24 * 3600))
+CONTENT_MAX_ENTRIES = int(os.environ.get("CONTENT_CACHE_MAX_ENTRIES", 5000))
+
+# LLM replies to prompts that do not depend on the user (e.g. the chat greeting), shared by every session
+LLM_CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 24 * 3600))
+
+# Returned by PersistentCache.get on a miss, since None is a valid (negative) cached value
+MISSING = object()
+
+
+# Function to turn a city name into a cache key ("  São  PAULO " -> "sao paulo")
+def normalize_city(city):
+    text = unicodedata.normalize("NFKD", city or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.casefold().split())
+
+
+# Function to build a content-addressed key from any JSON-serializable parts
+def content_key(*parts):
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# In-memory LRU in front of a SQLite table, with per-entry expiry.
+# A value of None is a negative result and expires after negative_ttl.
+# With max_entries set, the least recently used rows on disk are evicted in batches:
+# once the namespace grows past max_entries by `evict_slack` rows (a tenth of the cap
+# by default), it is trimmed back to max_entries, so most writes skip the eviction query.
+# `encode`/`decode` convert between the value kept in memory and the JSON stored on disk.
+class PersistentCache:
+    def __init__(self, namespace, ttl, negative_ttl=None, memory_size=1024, max_entries=None, path=CACHE_PATH, evict_slack=None,
+                 encode=None, decode=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.evict_slack = evict_slack if evict_slack is not None else max(1, (max_entries or 0) // 10)
+        self.path = path
+        self.encode = encode
+        self.decode = decode
+        self._rows = None  # Rows in the namespace on disk, counted on the first capped write; replaced keys count again
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL without a sync per commit: a crash may lose the last few entries, which is fine for a cache
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT, key TEXT, value TEXT, expires_at REAL, accessed_at REAL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS cache_lru ON cache (namespace, accessed_at)")
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key, expires_at, value):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def get(self, key, default=MISSING):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    metrics.record_cache(self.namespace, True)
+                    return entry[1]
+                del self._memory[key]
+
+            try:
+                db = self._connect()
+                row = db.execute(
+                    "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None:
+                    metrics.record_cache(self.namespace, False)
+                    return default
+                if row[1] <= now:
+                    db.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    db.commit()
+                    metrics.record_cache(self.namespace, False)
+                    return default
+                db.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (now, self.namespace, key),
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                print("Cache Error:", e)  # Debugging
+                metrics.record_cache(self.namespace, False)
+                return default
+
+            metrics.record_cache(self.namespace, True)
+            value = json.loads(row[0])
+            if self.decode is not None and value is not None:
+                value = self.decode(value)
+            self._remember(key, row[1], value)
+            return value
+
+    def set(self, key, value):
+        now = time.time()
+        expires_at = now + (self.negative_ttl if value is None else self.ttl)
+        stored = json.dumps(value if self.encode is None or value is None else self.encode(value))
+        with self._lock:
+            self._remember(key, expires_at, value)
+            try:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, stored, expires_at, now),
+                )
+                if self.max_entries is not None:
+                    self._evict(db)
+                db.commit()
+            except sqlite3.Error as e:
+                print("Cache Error:", e)  # Debugging
+
+    # Function to trim the namespace back to max_entries rows once it has grown past the cap by
+    # evict_slack rows. Between recounts the count only grows (overwrites count as new rows), so
+    # eviction may run early but never later than evict_slack of this process's writes.
+    def _evict(self, db):
+        if self._rows is None:
+            self._rows = db.execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+        else:
+            self._rows += 1
+        if self._rows <= self.max_entries + self.evict_slack:
+            return
+        db.execute(
+            "DELETE FROM cache WHERE namespace = ? AND key IN ("
+            "SELECT key FROM cache WHERE namespace = ? ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.namespace, self.namespace, self.max_entries),
+        )
+        self._rows = db.execute("SELECT COUNT(*) FROM cache WHERE namespace = ?", (self.namespace,)).fetchone()[0]
+
+    # Function to drop every entry in this namespace, in memory and on disk
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            try:
+                db = self._connect()
+                db.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+                db.commit()
+                self._rows = 0
+            except sqlite3.Error as e:
+                print("Cache Error:", e)  # Debugging
+
+
+# Shared geocoding cache: normalized city name -> [lat, lon] or None
+geocode_cache = PersistentCache("geocode", ttl=GEOCODE_TTL, negative_ttl=GEOCODE_NEGATIVE_TTL)
+
+# Shared AI description cache: content_key(place, city, model, prompt hash) -> description
+description_cache = PersistentCache(
+    "description", ttl=DESCRIPTION_TTL, memory_size=4096, max_entries=DESCRIPTION_MAX_ENTRIES
+)
+
+# Function to store a place lookup on disk with its POIs as Overpass-style elements
+def encode_places(entry):
+    return {"fetched_at": entry["fetched_at"], "elements": entry["elements"].to_elements()}
+
+
+# Function to load a place lookup from disk as columnar POIs
+def decode_places(entry):
+    from .poi import POIs  # Deferred so importing the cache does not load NumPy
+
+    return {"fetched_at": entry["fetched_at"], "elements": POIs.from_elements(entry["elements"])}
+
+
+# Shared place lookup cache: content_key(city, place type, radius, limit) -> {"fetched_at": ..., "elements": POIs}.
+# Rows live for PLACES_STALE_TTL; callers treat them as stale after PLACES_TTL.
+places_cache = PersistentCache("places", ttl=PLACES_STALE_TTL, encode=encode_places, decode=decode_places)
+
+# Shared WikiVoyage guide cache: normalized destination -> guide text, or None for pages without one
+guide_cache = PersistentCache("guide", ttl=GUIDE_TTL, negative_ttl=GUIDE_NEGATIVE_TTL, max_entries=CONTENT_MAX_ENTRIES)
+
+# Shared Google search cache: content_key(query, engine, results) -> list of snippets
+search_cache = PersistentCache("search", ttl=SEARCH_TTL, max_entries=CONTENT_MAX_ENTRIES)
+
+# Shared LLM reply cache: content_key(model URL, prompt, parameters) -> generated text
+llm_cache = PersistentCache("llm", ttl=LLM_CACHE_TTL)
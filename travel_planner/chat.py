@@ -0,0 +1,164 @@
+from datetime import datetime
+
+from . import config, http_client, metrics
+from .cache import MISSING, content_key, llm_cache
+from .content import DEFAULT_PREFERENCES, activity_query, google_search
+from .llm_stream import stream_huggingface
+
+# Conversational planning with a HuggingFace chat model (testing.py's engine)
+HUGGINGFACE_MODEL_URL = "https://api-inference.huggingface.co/models/mistralai/Mixtral-8x7B-Instruct-v0.1"
+
+# System Prompts (Modular Approach)
+SYSTEM_PROMPTS = {
+    "initial_greeting": """You are a friendly travel assistant. Start by welcoming the user and asking for:
+    1. Destination
+    2. Travel dates
+    3. Number of travelers
+    4. Primary purpose (leisure/business/etc.)
+    Keep questions conversational.""",
+
+    "preference_refinement": """Ask follow-up questions about:
+    - Dietary restrictions (vegan/gluten-free/etc.)
+    - Mobility considerations
+    - Must-see attractions
+    - Preferred pace (relaxed/balanced/fast)
+    - Accommodation style""",
+
+    "activity_search": """Search web for {destination} activities considering:
+    - {budget} budget
+    - {preferences}
+    - Current season {month}
+    - {activity_level} activity level
+    Prioritize local experiences and hidden gems""",
+
+    "itinerary_generation": """Create {duration}-day itinerary for {destination}:
+    - Budget: {budget}
+    - Travelers: {travelers}
+    - Preferences: {preferences}
+    Structure each day with:
+    Morning | Afternoon | Evening
+    Include:
+    - Transportation tips
+    - Meal recommendations
+    - Cost estimates
+    - Time buffers"""
+}
+
+# Generation settings shared by the blocking and streaming query functions
+def generation_parameters(max_length):
+    return {
+        "max_length": max_length,
+        "temperature": 0.7,
+        "top_p": 0.95,
+        "repetition_penalty": 1.2
+    }
+
+# Enhanced AI Query Function
+@metrics.timed("llm", op="chat")
+def query_huggingface(prompt, max_length=1500):
+    data = {
+        "inputs": prompt,
+        "parameters": generation_parameters(max_length)
+    }
+
+    try:
+        headers = {"Authorization": f"Bearer {config.require('HUGGINGFACE_API_KEY')}"}
+        response = http_client.post(
+            HUGGINGFACE_MODEL_URL,
+            headers=headers,
+            json=data,
+            timeout=http_client.GENERATION_TIMEOUT
+        )
+        return response.json()[0]["generated_text"].strip()
+    except Exception as e:
+        return f"Error: {str(e)}"
+
+# Function to answer a prompt that is the same for every user (e.g. the greeting) from the shared
+# cache, calling the model only on a miss. Errors are not cached.
+def cached_query_huggingface(prompt, max_length=1500):
+    cache_key = content_key(HUGGINGFACE_MODEL_URL, prompt, generation_parameters(max_length))
+    cached = llm_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    response = query_huggingface(prompt, max_length)
+    if not response.startswith("Error:"):
+        llm_cache.set(cache_key, response)
+    return response
+
+# Streaming AI Query Function: yields text chunks as the model generates them
+def stream_query_huggingface(prompt, max_length=1500):
+    try:
+        yield from stream_huggingface(HUGGINGFACE_MODEL_URL, config.require("HUGGINGFACE_API_KEY"), prompt, generation_parameters(max_length))
+    except Exception as e:
+        yield f"Error: {str(e)}"
+
+# Bonus Challenge Implementation
+def handle_vague_inputs(user_input):
+    clarification_prompt = f"""
+    User wrote: "{user_input}"
+    This input might be vague or incomplete. Ask one specific clarifying question about:
+    - Budget specifics (e.g., exact amount or range)
+    - Activity preferences (e.g., outdoor vs. indoor, cultural vs. adventure)
+    - Travel style (e.g., luxury vs. budget, fast-paced vs. relaxed)
+    - Any missing key information (destination, dates, number of travelers)
+    Make the question conversational and friendly.
+    """
+    return query_huggingface(clarification_prompt)
+
+# Function to check whether a chat message is too vague to refine on (Bonus Challenge)
+def is_vague(user_input):
+    return len(user_input.split()) < 5 or "moderate budget" in user_input.lower() or "mix of" in user_input.lower()
+
+# Function to ask the model for follow-up questions, given the trip details, summary and last turns in `memory`
+def refine_preferences(memory):
+    refinement_prompt = f"""Current conversation:
+{memory.context(recent=3)}
+
+{SYSTEM_PROMPTS["preference_refinement"]}"""
+    return query_huggingface(refinement_prompt)
+
+# Prompt for the final itinerary, enriched with web search results
+def build_final_prompt(memory=None):
+    user_data = extract_user_data(memory)
+    activities = google_search(activity_query(user_data["destination"], user_data["preferences"]))[:3]
+
+    return SYSTEM_PROMPTS["itinerary_generation"].format(
+        **user_data,
+        activities=", ".join(activities),
+        month=datetime.now().strftime("%B")
+    )
+
+# Itinerary Generation with Web Data
+def generate_final_itinerary(memory=None):
+    try:
+        prompt = build_final_prompt(memory)
+    except config.MissingAPIKey as e:
+        return f"Error: {e}"
+    return query_huggingface(prompt, max_length=2000)
+
+# Streaming Itinerary Generation with Web Data (the prompt is built before the first chunk is requested)
+def stream_final_itinerary(memory=None):
+    try:
+        prompt = build_final_prompt(memory)
+    except config.MissingAPIKey as e:
+        return iter([f"Error: {e}"])
+    return stream_query_huggingface(prompt, max_length=2000)
+
+# Helper function to extract user data from conversation: details the user gave (kept as
+# facts by ConversationMemory) override the placeholder defaults
+def extract_user_data(memory=None):
+    user_data = {
+        "destination": "Paris",
+        "budget": "moderate",
+        "duration": "5 days",
+        "travelers": "2",
+        "preferences": DEFAULT_PREFERENCES
+    }
+    facts = memory.facts if memory is not None else {}
+    for key in ("destination", "budget", "preferences"):
+        if facts.get(key):
+            user_data[key] = facts[key]
+    if facts.get("days"):
+        user_data["duration"] = f"{facts['days']} days"
+    return user_data
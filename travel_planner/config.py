@@ -0,0 +1,22 @@
+import os
+
+# API keys shared by the engine, read from the environment. No keys ship with the
+# package: a call that needs an unset key raises MissingAPIKey naming the variable.
+# Modules read them at call time, so a front end can also assign e.g.
+# `config.OPENROUTER_API_KEY = ...` before generating.
+OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY", "")
+HUGGINGFACE_API_KEY = os.environ.get("HUGGINGFACE_API_KEY", "")
+GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID", "")  # Custom Search Engine ID
+GOOGLE_API_KEY = os.environ.get("GOOGLE_API_KEY", "")
+
+
+class MissingAPIKey(ValueError):
+    pass
+
+
+# Function to read a key at call time, raising MissingAPIKey when it is unset
+def require(name):
+    value = globals()[name]
+    if not value:
+        raise MissingAPIKey(f"🔑 {name} is not set. Add it to the environment (see travel_planner/config.py).")
+    return value
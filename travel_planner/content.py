@@ -0,0 +1,152 @@
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import config, http_client, metrics
+from .cache import MISSING, content_key, guide_cache, normalize_city, search_cache
+from .singleflight import singleflight
+
+WIKIVOYAGE_URL = "https://en.wikivoyage.org/w/api.php"
+GUIDE_CHARS = 300  # Guide text kept for the itinerary prompt; only this much is requested
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+SEARCH_RESULTS = 5
+DEFAULT_PREFERENCES = "cultural sights, local cuisine"  # Used in the activity search until the user says otherwise
+
+# Background prefetch: destinations whose guide and activity search are kept in the cache,
+# e.g. PREFETCH_DESTINATIONS="Paris,Rome,Tokyo". Each pass fetches only what is missing or
+# expired, so a destination costs one search per SEARCH_CACHE_TTL at most.
+PREFETCH_DESTINATIONS = [name.strip() for name in os.environ.get("PREFETCH_DESTINATIONS", "").split(",") if name.strip()]
+PREFETCH_INTERVAL = float(os.environ.get("PREFETCH_INTERVAL", 3600))  # Seconds between passes
+PREFETCH_SEARCH = os.environ.get("PREFETCH_SEARCH", "1") == "1"  # Set to 0 to prefetch guides only
+PREFETCH_WORKERS = 2
+
+_prefetch_thread = None
+_prefetch_lock = threading.Lock()
+
+# Function to get travel insights from WikiVoyage: the plain-text intro, cut to GUIDE_CHARS
+@metrics.timed("travel_guide")
+@singleflight(key=normalize_city)
+def get_travel_guide(destination):
+    cache_key = normalize_city(destination)
+    cached = guide_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached if cached is not None else "No information available."
+
+    params = {
+        "action": "query",
+        "prop": "extracts",
+        "format": "json",
+        "titles": destination,
+        "exintro": 1,
+        "explaintext": 1,
+        "exchars": GUIDE_CHARS,
+    }
+    try:
+        response = http_client.get(WIKIVOYAGE_URL, params=params)
+    except requests.exceptions.RequestException:
+        return "Failed to retrieve travel guide."
+
+    if response.status_code == 200:
+        try:
+            data = response.json()
+            page = next(iter(data["query"]["pages"].values()))  # Get first page found
+        except Exception:
+            return "No travel guide found."
+        if "extract" not in page:
+            guide_cache.set(cache_key, None)  # Remember destinations without a guide too
+            return "No information available."
+        guide = page["extract"][:GUIDE_CHARS]
+        guide_cache.set(cache_key, guide)
+        return guide
+    return "Failed to retrieve travel guide."
+
+# Function to build the search cache key for a query
+def search_cache_key(query):
+    return content_key(query, config.GOOGLE_CSE_ID, SEARCH_RESULTS)
+
+# Function to build the activity search used for the final itinerary
+def activity_query(destination, preferences=DEFAULT_PREFERENCES):
+    return f"{destination} {preferences} activities"
+
+# Web Search Integration (results are cached, so repeated itineraries cost no search quota).
+# Raises config.MissingAPIKey when GOOGLE_CSE_ID or GOOGLE_API_KEY is unset.
+@metrics.timed("web_search")
+@singleflight(key=search_cache_key)
+def google_search(query):
+    cache_key = search_cache_key(query)
+    cached = search_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    params = {
+        "q": query,
+        "cx": config.require("GOOGLE_CSE_ID"),
+        "key": config.require("GOOGLE_API_KEY"),
+        "num": SEARCH_RESULTS
+    }
+    response = http_client.get(GOOGLE_SEARCH_URL, params=params)
+    snippets = [item["snippet"] for item in response.json().get("items", [])]
+    if response.status_code == 200:
+        search_cache.set(cache_key, snippets)
+    return snippets
+
+# Function to warm the guide and search caches for `destinations`; returns the number of upstream lookups made
+def prefetch_content(destinations, search=PREFETCH_SEARCH, workers=PREFETCH_WORKERS):
+    def warm(destination):
+        fetched = 0
+        if guide_cache.get(normalize_city(destination)) is MISSING:
+            get_travel_guide(destination)
+            fetched += 1
+        query = activity_query(destination)
+        if search and search_cache.get(search_cache_key(query)) is MISSING:
+            try:
+                google_search(query)
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                print("Prefetch Error:", e)  # Debugging
+            fetched += 1
+        return fetched
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        return sum(executor.map(warm, destinations))
+
+# Function to start the background prefetch loop, once per process (safe to call on every
+# Streamlit rerun). Returns the thread, or None when there is nothing to prefetch.
+def start_prefetch(destinations=None, interval=PREFETCH_INTERVAL):
+    global _prefetch_thread
+    destinations = PREFETCH_DESTINATIONS if destinations is None else destinations
+    if not destinations:
+        return None
+
+    with _prefetch_lock:
+        if _prefetch_thread is None:
+            def run():
+                while True:
+                    try:
+                        prefetch_content(destinations)
+                    except Exception as e:
+                        print("Prefetch Error:", e)  # Debugging
+                    time.sleep(interval)
+
+            _prefetch_thread = threading.Thread(target=run, name="content-prefetch", daemon=True)
+            _prefetch_thread.start()
+        return _prefetch_thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the WikiVoyage guide and Google search caches, e.g. from cron.")
+    parser.add_argument("destinations", nargs="*", help="Destinations to prefetch (default: PREFETCH_DESTINATIONS)")
+    parser.add_argument("--no-search", action="store_true", help="Only prefetch guides, to save search quota")
+    args = parser.parse_args()
+
+    destinations = args.destinations or PREFETCH_DESTINATIONS
+    start = time.perf_counter()
+    fetched = prefetch_content(destinations, search=PREFETCH_SEARCH and not args.no_search)
+    print(f"Prefetched {len(destinations)} destinations in {time.perf_counter() - start:.1f}s ({fetched} upstream lookups)")
+
+
+if __name__ == "__main__":
+    main()
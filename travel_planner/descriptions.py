@@ -0,0 +1,127 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from . import config, http_client, metrics
+from .cache import BUNDLE_DIR, MISSING, content_key, description_cache, normalize_city
+from .singleflight import singleflight
+
+# Description generation settings
+DESCRIPTION_CONCURRENCY = 8  # Max OpenRouter calls in flight per itinerary
+DESCRIPTION_TIMEOUT = 20  # Seconds per OpenRouter call
+DESCRIPTION_BATCH_SIZE = 12  # Places described per batched OpenRouter call
+DESCRIPTION_URL = "https://openrouter.ai/api/v1/chat/completions"
+DESCRIPTION_ERROR = "⚠️ Error generating description."  # Shown for a place whose description failed; never cached
+DESCRIPTION_MODEL = "mistralai/mistral-7b-instruct"
+DESCRIPTION_PROMPT = "Write a very short travel description for {place}. Keep it within one or two sentences."
+DESCRIPTION_BATCH_PROMPT = (
+    "Write a very short travel description (one or two sentences) for each of these places. "
+    "Reply with only a JSON object that maps each place name, exactly as given, to its description.\n{places}"
+)
+# Changing either prompt changes this hash, so stale cached descriptions are never reused
+DESCRIPTION_PROMPT_HASH = content_key(DESCRIPTION_PROMPT, DESCRIPTION_BATCH_PROMPT)[:16]
+
+# Function to build the description cache key for a place in a city
+def description_cache_key(place, city=None):
+    return content_key(place, normalize_city(city), DESCRIPTION_MODEL, DESCRIPTION_PROMPT_HASH)
+
+# Function to generate AI-based descriptions using OpenRouter API
+@metrics.timed("llm", op="description")
+@singleflight(key=description_cache_key)
+def generate_description(place, city=None):
+    cache_key = description_cache_key(place, city)
+    cached = description_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    headers = {"Authorization": f"Bearer {config.require('OPENROUTER_API_KEY')}", "Content-Type": "application/json"}
+    payload = {
+        "model": DESCRIPTION_MODEL,
+        "messages": [{"role": "user", "content": DESCRIPTION_PROMPT.format(place=place)}],
+        "max_tokens": 50
+    }
+
+    # A 200 can still carry {"error": ...} or a null content, which gets the fallback too
+    try:
+        response = http_client.post(DESCRIPTION_URL, headers=headers, json=payload, timeout=DESCRIPTION_TIMEOUT)
+        response.raise_for_status()
+        description = response.json()["choices"][0]["message"]["content"]
+    except (requests.exceptions.RequestException, KeyError, IndexError, TypeError, ValueError):
+        return DESCRIPTION_ERROR
+    if not isinstance(description, str) or not description.strip():
+        return DESCRIPTION_ERROR
+
+    description = description.strip()
+    description_cache.set(cache_key, description)
+    return description
+
+# Function to describe several places with one OpenRouter call; returns {place: description}
+@metrics.timed("llm", op="description_batch")
+@singleflight(key=tuple)
+def generate_description_batch(places):
+    headers = {"Authorization": f"Bearer {config.require('OPENROUTER_API_KEY')}", "Content-Type": "application/json"}
+    prompt = DESCRIPTION_BATCH_PROMPT.format(places=json.dumps(places, ensure_ascii=False))
+    payload = {
+        "model": DESCRIPTION_MODEL,
+        "messages": [{"role": "user", "content": prompt}],
+        "max_tokens": 60 * len(places) + 20
+    }
+
+    try:
+        response = http_client.post(DESCRIPTION_URL, headers=headers, json=payload, timeout=DESCRIPTION_TIMEOUT)
+        response.raise_for_status()
+        content = response.json()["choices"][0]["message"]["content"]
+    except (requests.exceptions.RequestException, KeyError, IndexError, TypeError, ValueError):
+        return {}
+    if not isinstance(content, str):
+        return {}
+
+    # The model may wrap the object in prose or a code fence, so parse the outermost braces
+    try:
+        parsed = json.loads(content[content.index("{"):content.rindex("}") + 1])
+    except ValueError:
+        return {}
+    if not isinstance(parsed, dict):
+        return {}
+
+    return {
+        place: parsed[place].strip()
+        for place in places
+        if isinstance(parsed.get(place), str) and parsed[place].strip()
+    }
+
+# Function to look up the descriptions already known for `places`, in the city's bundle or
+# the description cache; returns {place: description} without any OpenRouter call
+def cached_descriptions(places, city=None):
+    descriptions = {}
+    if BUNDLE_DIR and city:
+        from .bundles import load_bundle  # NumPy is only needed once bundles are configured
+
+        bundle = load_bundle(city)
+        if bundle is not None:
+            descriptions.update(bundle.descriptions_for(places))
+
+    for place in places:
+        if place in descriptions:
+            continue
+        cached = description_cache.get(description_cache_key(place, city))
+        if cached is not MISSING:
+            descriptions[place] = cached
+    return descriptions
+
+# Function to describe many places: batched prompts first, per-place calls only for gaps
+def generate_descriptions(places, max_workers=DESCRIPTION_CONCURRENCY, city=None):
+    descriptions = cached_descriptions(places, city)
+    uncached = [place for place in places if place not in descriptions]
+    batches = [uncached[i:i + DESCRIPTION_BATCH_SIZE] for i in range(0, len(uncached), DESCRIPTION_BATCH_SIZE)]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for batch_result in executor.map(metrics.bind(generate_description_batch), batches):
+            for place, description in batch_result.items():
+                description_cache.set(description_cache_key(place, city), description)
+            descriptions.update(batch_result)
+
+        missing = [place for place in places if place not in descriptions]
+        descriptions.update(zip(missing, executor.map(metrics.bind(generate_description), missing, [city] * len(missing))))
+
+    return descriptions
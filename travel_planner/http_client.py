@@ -0,0 +1,281 @@
+import email.utils
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metrics
+from .ratelimit import AdaptiveLimiter, TokenBucket
+
+# Shared HTTP client: one keep-alive connection pool per upstream host, with the
+# same timeout and retry policy for geocoding, Overpass, OpenRouter, HuggingFace,
+# WikiVoyage and Google calls.
+HTTP_POOL_CONNECTIONS = int(os.environ.get("HTTP_POOL_CONNECTIONS", 10))  # Hosts kept in the pool manager
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 20))  # Keep-alive connections per host
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 30))
+# Non-streamed LLM generations send nothing until the whole completion is done, so they get a longer read timeout
+HTTP_GENERATION_TIMEOUT = float(os.environ.get("HTTP_GENERATION_TIMEOUT", 300))
+GENERATION_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_GENERATION_TIMEOUT)
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 2))
+HTTP_BACKOFF = float(os.environ.get("HTTP_BACKOFF", 0.5))  # Sleeps 0.5s, 1s, 2s ... between retries
+
+# Statuses worth retrying: rate limits, overloaded mirrors and "model loading" responses
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Upstream origin -> replacement origin, e.g. to point every app at local stand-in servers:
+# HTTP_UPSTREAM_OVERRIDES='{"https://openrouter.ai": "http://127.0.0.1:8003"}' streamlit run planner.py
+UPSTREAM_OVERRIDES = json.loads(os.environ.get("HTTP_UPSTREAM_OVERRIDES") or "{}")
+
+# Upstream host (or "host/model", see limiter_key) -> requests per second, shared by every
+# thread in the process, e.g. HTTP_RATE_LIMITS='{"openrouter.ai": 5, "overpass.kumi.systems": 2}'
+HTTP_RATE_LIMITS = json.loads(os.environ.get("HTTP_RATE_LIMITS") or "{}")
+
+# LLM providers: calls go through an adaptive concurrency limit per model (see ratelimit.py),
+# and RETRY_STATUSES answers are retried here rather than inside urllib3, so the limiter sees
+# 429/503s, Retry-After is honoured and no retry waits past the call's deadline
+ADAPTIVE_HOSTS = [host.strip() for host in os.environ.get("ADAPTIVE_HOSTS", "openrouter.ai,api-inference.huggingface.co").split(",") if host.strip()]
+THROTTLE_STATUSES = (429, 503)
+HTTP_QUEUE_TIMEOUT = float(os.environ.get("HTTP_QUEUE_TIMEOUT", 30))  # Default seconds an LLM call may wait for a slot
+
+_session = None
+_adaptive_session = None
+_session_options = {}
+_session_lock = threading.Lock()
+_rate_limiters = {}
+_adaptive_limiters = {}
+
+
+# Raised when a call could not start before its deadline (no rate-limit token or concurrency slot in time)
+class QueueTimeout(requests.exceptions.Timeout):
+    pass
+
+
+# Function to build the retry policy. Connection failures and retryable statuses are
+# retried with backoff (honouring Retry-After); read timeouts are not, so a slow
+# upstream never costs more than one timeout.
+def build_retry(retries=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF, status_retries=None):
+    return Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries if status_retries is None else status_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # Hand the last response back so callers can inspect it
+    )
+
+
+# Function to create a session with pooled adapters for http and https
+def build_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                  retries=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF, status_retries=None):
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=build_retry(retries, backoff_factor, status_retries),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Function to get the process-wide session, creating it on first use. The `adaptive`
+# session (for ADAPTIVE_HOSTS) leaves status retries to adaptive_request().
+def get_session(adaptive=False):
+    global _session, _adaptive_session
+    if (_adaptive_session if adaptive else _session) is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session(**_session_options)
+            if _adaptive_session is None:
+                _adaptive_session = build_session(**_session_options, status_retries=0)
+    return _adaptive_session if adaptive else _session
+
+
+# Function to replace the shared sessions, e.g. with bigger pools for batch jobs
+def configure(**kwargs):
+    global _session, _adaptive_session, _session_options
+    with _session_lock:
+        old_sessions = (_session, _adaptive_session)
+        _session_options = kwargs
+        _session = build_session(**kwargs)
+        _adaptive_session = build_session(**kwargs, status_retries=0)
+    for old_session in old_sessions:
+        if old_session is not None:
+            old_session.close()
+
+
+# Function to redirect upstream origins, e.g. {"https://openrouter.ai": "http://127.0.0.1:8003"}
+def route_hosts(mapping):
+    UPSTREAM_OVERRIDES.update(mapping)
+
+
+# Function to cap the request rate per upstream host, e.g. {"openrouter.ai": 5}; a rate of None removes the cap
+def set_rate_limits(limits):
+    with _session_lock:
+        for host, rate in limits.items():
+            if rate is None:
+                _rate_limiters.pop(host, None)
+            else:
+                _rate_limiters[host] = TokenBucket(rate)
+
+
+set_rate_limits(HTTP_RATE_LIMITS)
+
+
+def resolve_url(url):
+    for origin, replacement in UPSTREAM_OVERRIDES.items():
+        if url.startswith(origin):
+            return replacement + url[len(origin):]
+    return url
+
+
+# Function to name the model a call is for: "host/model" from an OpenRouter-style JSON body,
+# else host + path (HuggingFace puts the model in the URL)
+def limiter_key(host, url, json_body=None):
+    model = json_body.get("model") if isinstance(json_body, dict) else None
+    return f"{host}/{model}" if model else f"{host}{urlsplit(url).path}"
+
+
+# Function to get the shared adaptive limiter for a model, creating it on first use
+def get_adaptive_limiter(key):
+    with _session_lock:
+        limiter = _adaptive_limiters.get(key)
+        if limiter is None:
+            limiter = _adaptive_limiters[key] = AdaptiveLimiter(key)
+        return limiter
+
+
+# Function to report every adaptive limiter's current limit and calls in flight
+def adaptive_limiter_states():
+    with _session_lock:
+        limiters = list(_adaptive_limiters.values())
+    return {limiter.name: limiter.state() for limiter in limiters}
+
+
+# Function to read how long a throttled response asks us to wait: Retry-After (seconds or
+# an HTTP date), or the "estimated_time" HuggingFace sends while a model is loading
+def retry_after(response):
+    value = response.headers.get("Retry-After")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    try:
+        return float(response.json()["estimated_time"])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+# `deadline` (a time.monotonic() value) bounds how long the call may wait to start: for a
+# rate-limit token, a concurrency slot or a Retry-After pause. Past it, QueueTimeout is raised.
+def request(method, url, timeout=None, deadline=None, **kwargs):
+    if timeout is None:
+        timeout = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+    # Limits and metrics are keyed by the real upstream host, before any override is applied
+    host = urlsplit(url).hostname
+    adaptive = host in ADAPTIVE_HOSTS
+    if adaptive and deadline is None:
+        deadline = time.monotonic() + HTTP_QUEUE_TIMEOUT
+    key = limiter_key(host, url, kwargs.get("json")) if adaptive or _rate_limiters else host
+    if adaptive:
+        return adaptive_request(method, url, key, deadline, timeout, kwargs)
+    take_token(host, key, deadline)
+    return send(get_session(), method, url, host, timeout, kwargs)
+
+
+# Function to wait for the call's rate-limit token, if its model or host has a rate limit
+def take_token(host, key, deadline):
+    limiter = _rate_limiters.get(key) or _rate_limiters.get(host)
+    if limiter is not None and not limiter.acquire(timeout=None if deadline is None else max(0.0, deadline - time.monotonic())):
+        raise QueueTimeout(f"Rate limit for {key} left no slot before the deadline")
+
+
+# Function to make an LLM call under its model's adaptive limiter, retrying RETRY_STATUSES
+# answers after Retry-After (or exponential backoff) while that still fits before the deadline.
+# Only 429/503 shrink the limit; 500/502/504 are retried like on the shared session.
+# The last failed response is returned as is, for the caller's usual error handling.
+def adaptive_request(method, url, key, deadline, timeout, kwargs):
+    limiter = get_adaptive_limiter(key)
+    host = urlsplit(url).hostname
+    for attempt in range(HTTP_RETRIES + 1):
+        take_token(host, key, deadline)  # Every attempt counts against the quota
+        if not limiter.acquire(deadline):
+            raise QueueTimeout(f"No {key} slot became free before the deadline")
+        started = time.monotonic()
+        try:
+            response = send(get_session(adaptive=True), method, url, host, timeout, kwargs)
+        except requests.exceptions.RequestException:
+            limiter.release(started, overloaded=True)
+            raise
+
+        latency = time.monotonic() - started
+        if response.status_code not in RETRY_STATUSES:
+            if kwargs.get("stream"):
+                release_on_close(response, limiter, started, latency)
+            else:
+                limiter.release(started, latency)
+            return response
+
+        # A 503 (e.g. model loading) holds back every caller of the model; a 429 already
+        # shrinks the shared limit, so only this call waits before retrying
+        throttled = response.status_code in THROTTLE_STATUSES
+        wait = retry_after(response) if throttled else None
+        limiter.release(started, latency, overloaded=throttled, retry_after=wait if response.status_code == 503 else None)
+        wait = wait if wait is not None else HTTP_BACKOFF * 2 ** attempt
+        if attempt == HTTP_RETRIES or time.monotonic() + wait >= deadline:
+            return response
+        response.close()
+        metrics.inc("upstream_retries", host=host)  # urllib3 does not see these retries, so send() can't count them
+        time.sleep(wait)
+
+
+# Function to hold a streamed call's slot until its body is closed (the model is busy until then)
+def release_on_close(response, limiter, started, latency):
+    close = response.close
+    released = []
+
+    def close_and_release():
+        close()
+        if not released:
+            released.append(True)
+            limiter.release(started, latency)
+
+    response.close = close_and_release
+
+
+def send(session, method, url, host, timeout, kwargs):
+    if not metrics.ENABLED:
+        return session.request(method, resolve_url(url), timeout=timeout, **kwargs)
+
+    start = time.perf_counter()
+    try:
+        response = session.request(method, resolve_url(url), timeout=timeout, **kwargs)
+    except requests.exceptions.RequestException:
+        metrics.record_upstream(host, time.perf_counter() - start, start=start)
+        raise
+    # Streamed bodies are not read here, so only their Content-Length is known
+    size = response.headers.get("Content-Length") if kwargs.get("stream") else len(response.content)
+    retries = getattr(getattr(response.raw, "retries", None), "history", ())
+    metrics.record_upstream(host, time.perf_counter() - start, response.status_code, int(size or 0), len(retries), start)
+    return response
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
@@ -0,0 +1,53 @@
+from . import config, metrics
+from .descriptions import DESCRIPTION_CONCURRENCY, generate_descriptions
+from .places import ATTRACTION_CANDIDATES, get_place_elements, place_names
+
+NO_MORE_ATTRACTIONS = "🚫 No more attractions found."
+BREAK_DESCRIPTION = "Enjoy a relaxing break or revisit your favorite spots."
+
+# Function to group nearby attractions (POIs, or a list of Overpass-style elements) into days and
+# order each day's stops by distance; returns one list of attraction indices per day
+def schedule_attractions(attractions, days):
+    from .poi import POIs  # Deferred so importing the engine does not load NumPy
+    from .scheduler import plan_days
+
+    if isinstance(attractions, list):
+        attractions = POIs.from_elements(attractions)
+    with metrics.span("schedule"):
+        return plan_days(attractions.lat, attractions.lon, days, per_day=3)
+
+# Function to format one day's stops, padded to three, with descriptions unless `descriptions` is None
+def format_day(day_places, descriptions=None):
+    day_places = day_places + [NO_MORE_ATTRACTIONS] * (3 - len(day_places))
+    if descriptions is None:
+        return [f"➡️ **{place}**" for place in day_places]
+    return [
+        f"➡️ **{place}**: {descriptions[place] if place != NO_MORE_ATTRACTIONS else BREAK_DESCRIPTION}"
+        for place in day_places
+    ]
+
+# Function to generate a travel itinerary. `describe=False` lists the stops without
+# AI descriptions; `place_options` (radius, overpass_url, timeout) go to get_place_elements.
+def generate_itinerary(city, days, attractions=None, describe=True, max_workers=DESCRIPTION_CONCURRENCY, **place_options):
+    if attractions is None:
+        attractions = get_place_elements(city, ["tourism=attraction"], {"tourism=attraction": ATTRACTION_CANDIDATES}, **place_options)["tourism=attraction"]
+    names = place_names(attractions)
+    if names[0].startswith("❌"):
+        return {"Error": names[0]}
+
+    # Group nearby attractions into the same day and order each day's stops by distance
+    plan = schedule_attractions(attractions, days)
+
+    # Describe each distinct scheduled attraction up front
+    descriptions = {}
+    if describe:
+        try:
+            with metrics.span("descriptions"):
+                descriptions = generate_descriptions(list(dict.fromkeys(names[i] for day_plan in plan for i in day_plan)), max_workers, city)
+        except config.MissingAPIKey as e:
+            return {"Error": str(e)}
+
+    return {
+        f"Day {day}": format_day([names[i] for i in day_plan], descriptions if describe else None)
+        for day, day_plan in enumerate(plan, start=1)
+    }
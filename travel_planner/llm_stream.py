@@ -0,0 +1,66 @@
+import json
+import time
+
+from . import http_client, metrics
+
+# Streaming completions: HuggingFace text-generation endpoints stream tokens as
+# server-sent events when the request sets "stream": true. Each event looks like
+#   data:{"token": {"text": " Paris", ...}, "generated_text": null, ...}
+# and the last one carries the complete generated_text.
+
+
+# Function to yield the JSON payload of each `data:` line in a server-sent-events response
+def iter_sse_events(response):
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        try:
+            yield json.loads(data)
+        except ValueError:
+            continue
+
+
+# Function to stream a HuggingFace completion, yielding text chunks as they arrive.
+# Raises requests exceptions for transport errors; HTTP errors are returned to the
+# caller through `on_error(response)`, whose return value is yielded as the text.
+def stream_huggingface(url, api_key, inputs, parameters, on_error=None, timeout=None):
+    headers = {"Authorization": f"Bearer {api_key}", "Accept": "text/event-stream"}
+    payload = {"inputs": inputs, "parameters": parameters, "stream": True}
+    start = time.perf_counter()
+    with metrics.span("llm", op="stream"), http_client.post(url, headers=headers, json=payload, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            yield on_error(response) if on_error else f"Error: {response.status_code} - {response.text}"
+            return
+
+        first_token = True
+        for event in iter_sse_events(response):
+            if "error" in event:
+                yield f"Error: {event['error']}"
+                return
+            token = event.get("token") or {}
+            if token.get("special"):
+                continue
+            if token.get("text"):
+                if first_token:
+                    metrics.observe("llm_first_token_seconds", time.perf_counter() - start)
+                    first_token = False
+                yield token["text"]
+
+
+# Function to render streamed chunks into a Streamlit placeholder and return the full text.
+# Redraws are throttled so long completions don't flood the frontend.
+def render_stream(chunks, placeholder, min_interval=0.05, cursor="▌", unsafe_allow_html=False):
+    text = ""
+    last_draw = 0.0
+    with metrics.span("render"):
+        for chunk in chunks:
+            text += chunk
+            now = time.monotonic()
+            if now - last_draw >= min_interval:
+                placeholder.markdown(text + cursor, unsafe_allow_html=unsafe_allow_html)
+                last_draw = now
+        placeholder.markdown(text, unsafe_allow_html=unsafe_allow_html)
+    return text
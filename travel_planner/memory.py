@@ -0,0 +1,102 @@
+import re
+from collections import deque
+
+from .extract import extract_travel_details
+
+# Bounded conversation memory for the chat planner. Recent turns are kept verbatim
+# up to a token budget; older ones are folded into a short running summary, and
+# trip details mentioned by the user are kept as structured facts. Prompts are
+# built from those three parts, so their size stays flat however long the chat runs.
+
+MEMORY_TOKEN_BUDGET = 800  # Tokens of verbatim recent turns kept for prompts
+SUMMARY_TOKEN_BUDGET = 250  # Tokens of running summary kept for prompts
+SUMMARY_LINE_CHARS = 160  # Characters kept from each turn folded into the summary
+TRANSCRIPT_LIMIT = 200  # Messages kept for display
+
+# Details extracted from user turns, and how they are labelled in prompts
+FACT_LABELS = {
+    "starting_city": "Starting from",
+    "destination": "Destination",
+    "days": "Days",
+    "budget": "Budget",
+    "purpose": "Purpose",
+    "preferences": "Preferences",
+    "dietary": "Food",
+    "accommodation": "Accommodation",
+}
+
+
+# Function to estimate the token count of a text (~4 characters per token for English)
+def estimate_tokens(text):
+    return len(text) // 4 + 1
+
+
+# Function to shorten a turn to one summary line: its first sentence, cut at SUMMARY_LINE_CHARS
+def summarize_turn(turn):
+    text = " ".join(turn["content"].split())
+    end = re.search(r"[.!?](\s|$)", text)
+    if end:
+        text = text[:end.start() + 1]
+    if len(text) > SUMMARY_LINE_CHARS:
+        text = text[:SUMMARY_LINE_CHARS - 1] + "…"
+    return f"{turn['role']}: {text}"
+
+
+class ConversationMemory:
+    def __init__(self, token_budget=MEMORY_TOKEN_BUDGET, summary_budget=SUMMARY_TOKEN_BUDGET,
+                 transcript_limit=TRANSCRIPT_LIMIT, summarize=summarize_turn):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summarize = summarize
+        self.turns = deque()  # Recent turns, verbatim
+        self.summary = deque()  # One line per older turn, oldest dropped first
+        self.facts = {}
+        self.transcript = deque(maxlen=transcript_limit)  # What the sidebar shows
+        self.turn_count = 0
+        self._turn_tokens = 0
+        self._summary_tokens = 0
+
+    def add(self, role, content):
+        turn = {"role": role, "content": content}
+        self.turn_count += 1
+        self.transcript.append(turn)
+        self.turns.append(turn)
+        self._turn_tokens += estimate_tokens(content)
+        if role == "User":
+            self.facts.update({key: value for key, value in extract_travel_details(content).items() if value})
+
+        # Keep at least the newest turn verbatim, however long it is
+        while self._turn_tokens > self.token_budget and len(self.turns) > 1:
+            oldest = self.turns.popleft()
+            self._turn_tokens -= estimate_tokens(oldest["content"])
+            self._fold(oldest)
+
+    def _fold(self, turn):
+        line = self.summarize(turn)
+        self.summary.append(line)
+        self._summary_tokens += estimate_tokens(line)
+        while self._summary_tokens > self.summary_budget and len(self.summary) > 1:
+            self._summary_tokens -= estimate_tokens(self.summary.popleft())
+
+    def facts_text(self):
+        return "; ".join(f"{FACT_LABELS.get(key, key)}: {value}" for key, value in self.facts.items())
+
+    # Function to build the context block for a prompt from facts, summary and the last `recent` turns
+    def context(self, recent=None):
+        turns = list(self.turns)[-recent:] if recent else list(self.turns)
+        parts = []
+        if self.facts:
+            parts.append(f"Known trip details: {self.facts_text()}")
+        if self.summary:
+            parts.append("Earlier in the conversation:\n" + "\n".join(self.summary))
+        if turns:
+            parts.append("Recent messages:\n" + "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns))
+        return "\n\n".join(parts)
+
+    # Function to return one page of the transcript, newest first (page 1 is the latest messages)
+    def page(self, number, size):
+        messages = list(self.transcript)[::-1]
+        return messages[(number - 1) * size:number * size]
+
+    def page_count(self, size):
+        return max(1, -(-len(self.transcript) // size))
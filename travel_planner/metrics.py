@@ -0,0 +1,292 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+
+# Lightweight instrumentation: stage timers, upstream call counters, cache hit
+# ratios, payload sizes and retry counts, exported as Prometheus text or JSON.
+# Off unless TRAVEL_PLANNER_METRICS=1 (or enable() is called); while off, span()
+# returns a shared no-op and the record functions return straight away.
+#
+#   with metrics.trace() as spans:   # Optional per-request breakdown
+#       with metrics.span("geocode"):
+#           ...
+#   print(metrics.render_prometheus())
+
+ENABLED = os.environ.get("TRAVEL_PLANNER_METRICS", "0") == "1"
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_counters = {}  # (name, labels) -> value
+_histograms = {}  # (name, labels) -> [bucket counts..., count, sum]
+_trace = contextvars.ContextVar("travel_planner_trace", default=None)
+
+
+def enable():
+    global ENABLED
+    ENABLED = True
+
+
+def disable():
+    global ENABLED
+    ENABLED = False
+
+
+# Function to drop every recorded value, e.g. between benchmark runs
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _labels(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def inc(name, value=1, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    if not ENABLED:
+        return
+    key = (name, _labels(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                histogram[i] += 1
+        histogram[-2] += 1
+        histogram[-1] += seconds
+
+
+# Function to add an entry to the current request's trace, if one is being collected
+def _record_trace(name, start, seconds, labels):
+    spans = _trace.get()
+    if spans is not None:
+        spans.append({"stage": name, **labels, "start_ms": round((start - spans.started) * 1000, 2), "ms": round(seconds * 1000, 2)})
+
+
+class _Span:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        observe("stage_seconds", seconds, stage=self.name, **self.labels)
+        if exc_type is not None:
+            inc("stage_errors", stage=self.name, **self.labels)
+        _record_trace(self.name, self.start, seconds, self.labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+# Function to time a block as a named stage: `with span("overpass"):`
+def span(name, **labels):
+    if not ENABLED:
+        return _NOOP_SPAN
+    return _Span(name, labels)
+
+
+# Decorator to time every call of a function as a named stage
+def timed(name, **labels):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Span(name, labels):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# Function to record one upstream HTTP call: latency, status, payload size and retries
+def record_upstream(host, seconds, status=None, response_bytes=None, retries=0, start=None):
+    if not ENABLED:
+        return
+    inc("upstream_requests", host=host, status=status if status is not None else "error")
+    if status is None or status >= 500 or status == 429:
+        inc("upstream_errors", host=host)
+    if response_bytes:
+        inc("upstream_response_bytes", response_bytes, host=host)
+    if retries:
+        inc("upstream_retries", retries, host=host)
+    observe("upstream_seconds", seconds, host=host)
+    _record_trace("upstream", start if start is not None else time.perf_counter() - seconds, seconds, {"host": host, "status": status})
+
+
+# Function to count a cache lookup as a hit or miss
+def record_cache(cache, hit):
+    if not ENABLED:
+        return
+    inc("cache_requests", cache=cache, result="hit" if hit else "miss")
+
+
+class _Trace(list):
+    __slots__ = ("started",)
+
+
+# Context manager collecting every span and upstream call of one request (in this
+# thread and in workers started through bind()) into a list of dicts
+class trace:
+    def __enter__(self):
+        self.spans = _Trace()
+        self.spans.started = time.perf_counter()
+        self._token = _trace.set(self.spans if ENABLED else None)
+        return self.spans
+
+    def __exit__(self, exc_type, exc, tb):
+        _trace.reset(self._token)
+        return False
+
+
+# Function to carry the caller's trace into a worker thread, e.g. executor.map(bind(fn), items)
+def bind(fn):
+    spans = _trace.get()
+    if spans is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _trace.set(spans)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _trace.reset(token)
+
+    return run
+
+
+# Function to summarize a trace by stage: {stage: {"calls": n, "ms": total}}
+def summarize(spans):
+    summary = {}
+    for entry in spans:
+        stage = summary.setdefault(entry["stage"], {"calls": 0, "ms": 0.0})
+        stage["calls"] += 1
+        stage["ms"] = round(stage["ms"] + entry["ms"], 2)
+    return summary
+
+
+# Function to return every metric as JSON-serializable data, with cache hit ratios
+def snapshot():
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(value) for key, value in _histograms.items()}
+
+    data = {
+        "counters": [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in sorted(counters.items())],
+        "histograms": [
+            {"name": name, "labels": dict(labels), "count": value[-2], "sum": round(value[-1], 6),
+             "buckets": dict(zip(map(str, BUCKETS), value[:len(BUCKETS)]))}
+            for (name, labels), value in sorted(histograms.items())
+        ],
+    }
+
+    lookups = {}
+    for (name, labels), value in counters.items():
+        if name == "cache_requests":
+            labels = dict(labels)
+            lookups.setdefault(labels["cache"], {"hit": 0, "miss": 0})[labels["result"]] += value
+    data["cache_hit_ratio"] = {cache: round(c["hit"] / (c["hit"] + c["miss"]), 4) for cache, c in sorted(lookups.items())}
+    return data
+
+
+def render_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+# Function to render every metric in the Prometheus text exposition format
+def render_prometheus(prefix="travel_planner_"):
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(value) for key, value in _histograms.items()}
+
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {prefix}{name}_total counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{prefix}{name}_total{_format_labels(labels)} {value}")
+
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f"# TYPE {prefix}{name} histogram")
+        for (metric, labels), value in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(BUCKETS, value):
+                lines.append(f"{prefix}{name}_bucket{_format_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{prefix}{name}_bucket{_format_labels(labels, [('le', '+Inf')])} {value[-2]}")
+            lines.append(f"{prefix}{name}_count{_format_labels(labels)} {value[-2]}")
+            lines.append(f"{prefix}{name}_sum{_format_labels(labels)} {value[-1]:.6f}")
+    return "\n".join(lines) + "\n"
+
+
+# Function to serve /metrics (Prometheus) and /metrics.json on a background thread; returns the server
+def start_http_server(port, host="127.0.0.1"):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.startswith("/metrics.json"):
+                body, content_type = render_json(), "application/json"
+            elif self.path.startswith("/metrics"):
+                body, content_type = render_prometheus(), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
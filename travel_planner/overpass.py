@@ -0,0 +1,41 @@
+# Helpers for fetching several place categories in one Overpass round trip
+
+
+# Function to split a "key=value" place type into its tag parts
+def split_place_type(place_type):
+    key, value = place_type.split("=", 1)
+    return key, value
+
+
+# Function to build one query that outputs up to `limit` nodes per place type.
+# Each category goes into its own named set so the limit applies per category;
+# `limit` may also be a {place_type: limit} dict.
+def build_union_query(place_types, lat, lon, radius, limit=10):
+    statements = []
+    for index, place_type in enumerate(place_types):
+        key, value = split_place_type(place_type)
+        place_limit = limit[place_type] if isinstance(limit, dict) else limit
+        statements.append(f'node["{key}"="{value}"](around:{radius}, {lat}, {lon})->.set{index};')
+        statements.append(f".set{index} out center {place_limit};")
+    body = "\n    ".join(statements)
+    return f"""
+    [out:json];
+    {body}
+    """
+
+
+# Function to route the combined `elements` back into one list per place type
+def split_elements(elements, place_types):
+    tags_by_type = {place_type: split_place_type(place_type) for place_type in place_types}
+    grouped = {place_type: [] for place_type in place_types}
+    seen = {place_type: set() for place_type in place_types}
+
+    for element in elements:
+        tags = element.get("tags", {})
+        for place_type, (key, value) in tags_by_type.items():
+            if tags.get(key) != value or element.get("id") in seen[place_type]:
+                continue
+            seen[place_type].add(element.get("id"))
+            grouped[place_type].append(element)
+
+    return grouped
@@ -0,0 +1,97 @@
+import asyncio
+
+from . import config, metrics
+from .descriptions import DESCRIPTION_BATCH_SIZE, DESCRIPTION_CONCURRENCY, cached_descriptions, generate_descriptions
+from .itinerary import format_day, schedule_attractions
+from .places import ATTRACTION_CANDIDATES, get_place_elements, place_names
+
+# Asyncio itinerary pipeline for planner.py. The stages run as a dependency graph
+# rather than one after another:
+#
+#   places: geocode once, then hotels, restaurants and attractions in one Overpass round trip
+#     ├── hotels and restaurants are reported straight away
+#     └── schedule ── cached descriptions, then batched prompts of DESCRIPTION_BATCH_SIZE
+#                     stops (in schedule order), all in flight together
+#                       └── each day is reported as soon as its stops are described
+#
+# so the total time is the places lookup plus the slowest description batch, and a
+# trip costs as many OpenRouter calls as generate_descriptions would send. The
+# blocking engine calls run in worker threads (asyncio.to_thread), which keeps the
+# shared HTTP session, retries, rate limits, breakers, caches and metrics trace.
+#
+#   async for kind, payload in stream_trip("Rome", 3):
+#       ...  # ("places", {"hotels": [...], "restaurants": [...]})
+#            # ("plan", {"Day 1": [stops without descriptions], ...})
+#            # ("day", ("Day 1", [stops with descriptions]))
+#            # ("error", message)
+
+TRIP_PLACE_TYPES = ["tourism=hotel", "amenity=restaurant", "tourism=attraction"]
+
+
+# Function to plan a trip, yielding events as each part is ready. `describe=False` stops
+# after the "plan" event; `place_options` (radius, overpass_url, timeout) go to get_place_elements.
+async def stream_trip(city, days, describe=True, max_workers=DESCRIPTION_CONCURRENCY, **place_options):
+    elements = await asyncio.to_thread(
+        get_place_elements, city, TRIP_PLACE_TYPES, {"tourism=attraction": ATTRACTION_CANDIDATES}, **place_options
+    )
+    attractions = elements["tourism=attraction"]
+    names = place_names(attractions)
+    if names[0].startswith("❌"):
+        yield "error", names[0]
+        return
+
+    yield "places", {"hotels": place_names(elements["tourism=hotel"]), "restaurants": place_names(elements["amenity=restaurant"])}
+
+    plan = schedule_attractions(attractions, days)
+    day_places = {f"Day {day}": [names[i] for i in day_plan] for day, day_plan in enumerate(plan, start=1)}
+    yield "plan", {label: format_day(places) for label, places in day_places.items()}
+    if not describe:
+        return
+
+    # Days whose stops are all cached are reported straight away
+    scheduled = list(dict.fromkeys(place for places in day_places.values() for place in places))
+    descriptions = await asyncio.to_thread(cached_descriptions, scheduled, city)
+    waiting = dict(day_places)
+
+    def finished_days():
+        for label in [label for label, places in waiting.items() if all(place in descriptions for place in places)]:
+            yield label, format_day(waiting.pop(label), descriptions)
+
+    for day in finished_days():
+        yield "day", day
+
+    uncached = [place for place in scheduled if place not in descriptions]
+    batches = [uncached[i:i + DESCRIPTION_BATCH_SIZE] for i in range(0, len(uncached), DESCRIPTION_BATCH_SIZE)]
+    limit = asyncio.Semaphore(max(1, max_workers))
+    fallback_workers = max(1, max_workers // max(1, len(batches)))  # Per-place retries for a batch's gaps
+
+    async def describe_batch(batch):
+        async with limit:
+            with metrics.span("descriptions"):
+                return await asyncio.to_thread(generate_descriptions, batch, fallback_workers, city)
+
+    tasks = [asyncio.create_task(describe_batch(batch)) for batch in batches]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            descriptions.update(await finished)
+            for day in finished_days():
+                yield "day", day
+    except config.MissingAPIKey as e:
+        yield "error", str(e)
+    finally:
+        # The consumer stopped early (or a call failed): drop the batches still waiting for a slot
+        for task in tasks:
+            task.cancel()
+
+
+# Function to run stream_trip to completion and return the same dict as itinerary.generate_itinerary
+async def plan_trip(city, days, describe=True, max_workers=DESCRIPTION_CONCURRENCY, **place_options):
+    itinerary = {}
+    async for kind, payload in stream_trip(city, days, describe, max_workers, **place_options):
+        if kind == "error":
+            return {"Error": payload}
+        if kind == "plan":
+            itinerary.update(payload)
+        elif kind == "day":
+            itinerary[payload[0]] = payload[1]
+    return itinerary
@@ -0,0 +1,250 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+
+from . import http_client, metrics
+from .cache import BUNDLE_DIR, MISSING, PLACES_TTL, content_key, geocode_cache, normalize_city, places_cache
+from .overpass import build_union_query, split_elements
+from .resilience import get_breaker
+from .singleflight import singleflight
+
+# Offline POI index built with `python -m travel_planner.poi_index extract.osm index.npz`; unset to query Overpass live
+POI_INDEX_PATH = os.environ.get("POI_INDEX_PATH")
+
+# Attractions fetched per itinerary, so the scheduler can pick compact groups for each day
+ATTRACTION_CANDIDATES = 60
+
+# Place search defaults (planner.py's); callers may pass their own per request
+PLACES_RADIUS = 50000  # Metres around the city centre
+OVERPASS_URL = "https://overpass.kumi.systems/api/interpreter"  # Faster alternative
+OVERPASS_TIMEOUT = 15  # Reduce timeout to 15s
+
+# Overpass instances tried, in order, after the one a caller asks for (comma-separated list in OVERPASS_MIRRORS)
+OVERPASS_MIRRORS = [
+    url.strip()
+    for url in os.environ.get(
+        "OVERPASS_MIRRORS", "https://overpass.kumi.systems/api/interpreter,https://overpass-api.de/api/interpreter"
+    ).split(",")
+    if url.strip()
+]
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+
+# Background refreshes of stale place lookups
+PLACES_REFRESH_WORKERS = 2
+_refresh_executor = None
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+# Function to get city coordinates
+@metrics.timed("geocode")
+@singleflight(key=normalize_city)
+def get_coordinates(city):
+    if BUNDLE_DIR:
+        from .bundles import load_bundle  # NumPy is only needed once bundles are configured
+
+        bundle = load_bundle(city)
+        if bundle is not None:
+            return bundle.lat, bundle.lon
+
+    # The offline POI index's gazetteer places the cities of its extract with no network
+    if POI_INDEX_PATH:
+        from .poi_index import load_poi_index  # NumPy is only needed once an index is configured
+
+        point = load_poi_index(POI_INDEX_PATH).locate(city)
+        if point is not None:
+            return point
+
+    cache_key = normalize_city(city)
+    cached = geocode_cache.get(cache_key)
+    if cached is not MISSING:
+        return tuple(cached) if cached else (None, None)
+
+    # Fail fast while the geocoder keeps timing out or erroring
+    breaker = get_breaker(GEOCODING_URL)
+    if not breaker.allow():
+        return None, None
+
+    url = f"{GEOCODING_URL}?name={city}&count=1&language=en&format=json"
+    try:
+        response = http_client.get(url, timeout=10)
+        if response.status_code < 500 and response.status_code != 429:
+            breaker.record_success()
+        response.raise_for_status()
+        data = response.json()
+        if "results" not in data or not data["results"]:
+            geocode_cache.set(cache_key, None)  # Remember unknown cities too
+            return None, None
+        lat = data["results"][0]["latitude"]
+        lon = data["results"][0]["longitude"]
+        geocode_cache.set(cache_key, [lat, lon])
+        return lat, lon
+    except requests.exceptions.RequestException as e:
+        if e.response is None or e.response.status_code >= 500 or e.response.status_code == 429:
+            breaker.record_failure()
+        print("API Error:", e)  # Debugging
+        return None, None
+
+# Function to list the Overpass instances to try: `overpass_url`, then the mirrors on other hosts
+# (so e.g. http:// and https:// URLs of one server are tried once)
+def overpass_urls(overpass_url):
+    urls = {}
+    for url in [overpass_url] + OVERPASS_MIRRORS:
+        urls.setdefault(urlsplit(url).hostname, url)
+    return list(urls.values())
+
+# Function to run an Overpass query, starting with `overpass_url` and failing over to the other
+# mirrors. Mirrors whose circuit (one per host) is open are skipped. All attempts together stay
+# within `timeout` seconds, and each attempt gets an even share of what is left, so one mirror
+# timing out still leaves time for the next. Returns the response JSON, or None if no mirror answered.
+@metrics.timed("overpass")
+def query_overpass(query, overpass_url=OVERPASS_URL, timeout=OVERPASS_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    urls = overpass_urls(overpass_url)
+    for attempt, url in enumerate(urls):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        breaker = get_breaker(urlsplit(url).hostname)
+        if not breaker.allow():
+            continue
+
+        # Mirrors whose circuit is open will be skipped, so they get no share
+        left = 1 + sum(get_breaker(urlsplit(later).hostname).state != "open" for later in urls[attempt + 1:])
+        try:
+            response = http_client.get(url, params={"data": query}, timeout=remaining / left)
+        except requests.exceptions.RequestException as e:
+            breaker.record_failure()
+            print("Overpass API Error:", e)  # Debugging
+            continue
+        if response.status_code >= 500 or response.status_code == 429:
+            breaker.record_failure()
+            print("Overpass API Error:", url, response.status_code)  # Debugging
+            continue
+
+        # Any other answer means the mirror is up, even if it rejected the query
+        breaker.record_success()
+        try:
+            response.raise_for_status()
+            return response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print("Overpass API Error:", e)  # Debugging
+            return None
+    return None
+
+# Function to build the cache key of one place type's lookup around a city
+def places_cache_key(city, place_type, radius, limit):
+    return content_key(normalize_city(city), place_type, radius, limit)
+
+# Function to fetch place types from Overpass and cache each type's places as POIs; returns {} if every mirror failed
+def fetch_place_elements(city, place_types, lat, lon, radius, limits, overpass_url, timeout):
+    from .poi import POIs  # Deferred so importing the engine does not load NumPy
+
+    query = build_union_query(place_types, lat, lon, radius, limit=limits)
+    data = query_overpass(query, overpass_url, timeout)
+    if data is None:
+        return {}
+
+    grouped = {place_type: POIs.from_elements(elements) for place_type, elements in split_elements(data.get("elements", []), place_types).items()}
+    for place_type, pois in grouped.items():
+        places_cache.set(places_cache_key(city, place_type, radius, limits[place_type]), {"fetched_at": time.time(), "elements": pois})
+    return grouped
+
+# Function to refresh stale place lookups on a background thread; a refresh already running for the same lookup is not repeated
+def schedule_refresh(city, place_types, lat, lon, radius, limits, overpass_url, timeout):
+    global _refresh_executor
+    key = (normalize_city(city), tuple(place_types), radius)
+    with _refresh_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(max_workers=PLACES_REFRESH_WORKERS, thread_name_prefix="places-refresh")
+
+    def refresh():
+        try:
+            fetch_place_elements(city, place_types, lat, lon, radius, limits, overpass_url, timeout)
+        finally:
+            with _refresh_lock:
+                _refreshing.discard(key)
+
+    _refresh_executor.submit(refresh)
+
+# Function to build the single-flight key for a place lookup (every argument that changes the result)
+def place_elements_key(city, place_types, limits=None, radius=PLACES_RADIUS, overpass_url=OVERPASS_URL, timeout=OVERPASS_TIMEOUT):
+    return (normalize_city(city), tuple(place_types), tuple(sorted((limits or {}).items())), radius, overpass_url, timeout)
+
+# Function to fetch places (with coordinates) for several place types in one request.
+# Each value is a columnar POIs result, or an "❌ ..." message when the lookup failed.
+@singleflight(key=place_elements_key)
+def get_place_elements(city, place_types, limits=None, radius=PLACES_RADIUS, overpass_url=OVERPASS_URL, timeout=OVERPASS_TIMEOUT):
+    limits = {place_type: (limits or {}).get(place_type, 10) for place_type in place_types}
+
+    # A precomputed bundle answers the place types it holds with these settings, without any upstream call
+    grouped = {}
+    if BUNDLE_DIR:
+        from .bundles import load_bundle  # NumPy is only needed once bundles are configured
+
+        bundle = load_bundle(city)
+        if bundle is not None:
+            grouped = {place_type: bundle.pois(place_type)[:limits[place_type]] for place_type in place_types if bundle.serves(place_type, radius, limits[place_type])}
+            if len(grouped) == len(place_types):
+                return grouped
+
+    lat, lon = get_coordinates(city)
+    if lat is None or lon is None:
+        return {place_type: "❌ Location not found. Try another city." for place_type in place_types}
+
+    # Place types in the offline POI index are answered locally; only the rest go to Overpass
+    if POI_INDEX_PATH:
+        from .poi import POIs  # NumPy is only needed once an index is configured
+        from .poi_index import load_poi_index
+
+        index = load_poi_index(POI_INDEX_PATH)
+        with metrics.span("poi_index"):
+            grouped.update({place_type: POIs.from_elements(index.query_radius(place_type, lat, lon, radius, limit=limits[place_type])) for place_type in place_types if index.has(place_type) and place_type not in grouped})
+    remaining = [place_type for place_type in place_types if place_type not in grouped]
+
+    # Cached lookups are answered at once; stale ones are refreshed in the background
+    stale = []
+    for place_type in remaining:
+        cached = places_cache.get(places_cache_key(city, place_type, radius, limits[place_type]))
+        if cached is not MISSING:
+            grouped[place_type] = cached["elements"]
+            if time.time() - cached["fetched_at"] > PLACES_TTL:
+                stale.append(place_type)
+    if stale:
+        schedule_refresh(city, stale, lat, lon, radius, limits, overpass_url, timeout)
+
+    missing = [place_type for place_type in remaining if place_type not in grouped]
+    if missing:
+        grouped.update(fetch_place_elements(city, missing, lat, lon, radius, limits, overpass_url, timeout))
+
+    return {place_type: grouped.get(place_type, "❌ Could not retrieve data.") for place_type in place_types}
+
+# Function to turn fetched places (POIs, a list of elements or an error message) into the list of place names to display
+def place_names(elements):
+    if isinstance(elements, str):
+        return [elements]
+    if not isinstance(elements, list):
+        return elements.names()
+    places = [element.get("tags", {}).get("name", "Unnamed Location") for element in elements]
+    return places if places else ["❌ No matching places found."]
+
+# Function to fetch several place types (e.g. hotels, restaurants, attractions) in one Overpass request,
+# each as a columnar POIs result (coordinates, ids and tags kept; `.names()` gives the display list).
+# Unlike get_place_elements, a failed lookup is an empty POIs carrying the error.
+def get_places_multi(city, place_types, **place_options):
+    from .poi import POIs  # Deferred so importing the engine does not load NumPy
+
+    return {
+        place_type: POIs.from_elements(pois) if isinstance(pois, str) else pois
+        for place_type, pois in get_place_elements(city, place_types, **place_options).items()
+    }
+
+# Function to fetch places using Overpass API, as a columnar POIs result
+def get_places(city, place_type, **place_options):
+    return get_places_multi(city, [place_type], **place_options)[place_type]
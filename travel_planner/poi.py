@@ -0,0 +1,181 @@
+import sys
+
+import numpy as np
+
+from .cache import normalize_city
+from .poi_index import haversine
+
+# Columnar place results. Instead of one JSON dict per place, a POIs object keeps
+# ids and coordinates in NumPy arrays, each place's name as an index into a shared
+# table of names, and its other tags as an index into a shared table of tag
+# tuples (keys and values interned), so thousands of places per city stay cheap
+# to hold in memory. Filters (distance, named, tag, dedupe) work on the arrays
+# and return another POIs sharing the same tables; iterating gives POI records.
+# The engine passes POIs end to end: get_place_elements returns them, places_cache
+# keeps them in its memory tier and the scheduler reads the coordinate arrays.
+#
+#   hotels = get_places("Rome", "tourism=hotel")
+#   nearby = hotels.within(41.9, 12.5, 2000).dedupe()
+#   for hotel in nearby:
+#       print(hotel.name, hotel.lat, hotel.lon, hotel.tags.get("stars"))
+
+UNNAMED = "Unnamed Location"
+NO_MATCHES = "❌ No matching places found."
+
+
+class POI:
+    __slots__ = ("id", "lat", "lon", "name", "tags")
+
+    def __init__(self, id, lat, lon, name, tags):
+        self.id = id
+        self.lat = lat
+        self.lon = lon
+        self.name = name
+        self.tags = tags
+
+    def __repr__(self):
+        return f"POI({self.id}, {self.name!r}, {self.lat:.5f}, {self.lon:.5f})"
+
+
+class POIs:
+    def __init__(self, ids, lat, lon, name_ids, tag_ids, names, tag_sets, error=None):
+        self.ids = ids  # int64 OSM ids
+        self.lat = lat  # float64
+        self.lon = lon  # float64
+        self.name_ids = name_ids  # int32 index into names, -1 when the place has no name
+        self.tag_ids = tag_ids  # int32 index into tag_sets
+        self.names_table = names  # Distinct names
+        self.tag_sets = tag_sets  # Distinct (key, value, key, value, ...) tuples, names excluded
+        self.error = error  # Why the lookup failed, if it did
+
+    # Function to build a POIs from Overpass-style elements, or an "❌ ..." lookup error message
+    @classmethod
+    def from_elements(cls, elements):
+        if isinstance(elements, str):
+            return cls._empty(error=elements)
+
+        names, tag_sets = {}, {}
+        count = len(elements)
+        ids = np.empty(count, dtype=np.int64)
+        lat = np.empty(count, dtype=np.float64)
+        lon = np.empty(count, dtype=np.float64)
+        name_ids = np.empty(count, dtype=np.int32)
+        tag_ids = np.empty(count, dtype=np.int32)
+
+        for i, element in enumerate(elements):
+            point = element if "lat" in element else element.get("center", {})  # Ways and relations carry a centre
+            ids[i] = element.get("id", 0)
+            lat[i] = point.get("lat", np.nan)
+            lon[i] = point.get("lon", np.nan)
+
+            tags = element.get("tags", {})
+            name = tags.get("name")
+            name_ids[i] = -1 if name is None else names.setdefault(name, len(names))
+            other = tuple(sys.intern(str(part)) for key, value in sorted(tags.items()) if key != "name" for part in (key, value))
+            tag_ids[i] = tag_sets.setdefault(other, len(tag_sets))
+
+        return cls(ids, lat, lon, name_ids, tag_ids, list(names), list(tag_sets))
+
+    # Function to build a POIs of one place type from arrays (as stored in bundles and the POI
+    # index); `names` has "" for unnamed places
+    @classmethod
+    def from_columns(cls, place_type, ids, lat, lon, names):
+        key, value = place_type.split("=", 1)
+        table = {}
+        name_ids = np.array([table.setdefault(name, len(table)) if name else -1 for name in names], dtype=np.int32)
+        return cls(
+            np.asarray(ids, dtype=np.int64), np.asarray(lat, dtype=np.float64), np.asarray(lon, dtype=np.float64),
+            name_ids, np.zeros(len(name_ids), dtype=np.int32), list(table), [(sys.intern(key), sys.intern(value))],
+        )
+
+    @classmethod
+    def _empty(cls, error=None):
+        return cls(
+            np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.float64),
+            np.empty(0, np.int32), np.empty(0, np.int32), [], [], error,
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (self._record(i) for i in range(len(self)))
+
+    # An integer gives one POI; a slice, index array or boolean mask gives a POIs
+    def __getitem__(self, selector):
+        if isinstance(selector, (int, np.integer)):
+            return self._record(selector)
+        return POIs(
+            self.ids[selector], self.lat[selector], self.lon[selector], self.name_ids[selector], self.tag_ids[selector],
+            self.names_table, self.tag_sets, self.error,
+        )
+
+    def _record(self, i):
+        name_id = self.name_ids[i]
+        return POI(int(self.ids[i]), float(self.lat[i]), float(self.lon[i]),
+                   self.names_table[name_id] if name_id >= 0 else None, self.tag_dict(i))
+
+    # Function to return the tags of place `i` as a dict, name included
+    def tag_dict(self, i):
+        flat = self.tag_sets[self.tag_ids[i]]
+        tags = dict(zip(flat[::2], flat[1::2]))
+        if self.name_ids[i] >= 0:
+            tags["name"] = self.names_table[self.name_ids[i]]
+        return tags
+
+    # Function to list the names to display, like place_names: unnamed places show as
+    # UNNAMED, and an empty or failed lookup gives a single "❌ ..." message
+    def names(self):
+        if not len(self):
+            return [self.error or NO_MATCHES]
+        return [self.names_table[name_id] if name_id >= 0 else UNNAMED for name_id in self.name_ids]
+
+    # Function to list every place's name, "" for unnamed ones
+    def raw_names(self):
+        return [self.names_table[name_id] if name_id >= 0 else "" for name_id in self.name_ids]
+
+    # Function to compute each place's distance in metres from a point
+    def distances(self, lat, lon):
+        return haversine(lat, lon, self.lat, self.lon)
+
+    def within(self, lat, lon, radius):
+        return self[self.distances(lat, lon) <= radius]
+
+    # Function to order places by distance from a point, nearest first
+    def nearest(self, lat, lon, limit=None):
+        order = np.argsort(self.distances(lat, lon), kind="stable")
+        return self[order[:limit]]
+
+    def named(self):
+        return self[self.name_ids >= 0]
+
+    # Function to keep places with a tag key, or a key=value pair when `value` is given
+    def with_tag(self, key, value=None):
+        if key == "name":
+            # The extra False entry is what unnamed places (name id -1) look up
+            matches = np.array([value is None or name == value for name in self.names_table] + [False], dtype=bool)
+            return self[matches[self.name_ids]]
+        matches = np.array([
+            any(flat[j] == key and (value is None or flat[j + 1] == value) for j in range(0, len(flat), 2))
+            for flat in self.tag_sets
+        ], dtype=bool)
+        return self[matches[self.tag_ids]] if len(matches) else self[:0]
+
+    # Function to drop unnamed places and repeats of a name (compared like city names,
+    # ignoring case and accents), keeping the first of each in the current order
+    def dedupe(self):
+        keys = {}
+        name_keys = np.array([keys.setdefault(normalize_city(name), len(keys)) for name in self.names_table], dtype=np.int64)
+        named = self.named()
+        _, first = np.unique(name_keys[named.name_ids], return_index=True)
+        return named[np.sort(first)]
+
+    # Function to convert back to Overpass-style elements (for the scheduler and the caches)
+    def to_elements(self):
+        return [
+            {"type": "node", "id": int(self.ids[i]), "lat": float(self.lat[i]), "lon": float(self.lon[i]), "tags": self.tag_dict(i)}
+            for i in range(len(self))
+        ]
+
+    def __repr__(self):
+        return f"POIs({len(self)} places)" if self.error is None else f"POIs(error={self.error!r})"
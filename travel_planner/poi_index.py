@@ -0,0 +1,281 @@
+import argparse
+import math
+import threading
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from .cache import normalize_city
+
+# Offline points-of-interest index built once from an OSM extract (.osm XML or .pbf).
+# Nodes are grouped by "key=value" place type (the same tags get_places uses) and
+# bucketed into a lat/lon grid, so radius and nearest-neighbour queries only look at
+# the cells around the query point. The index also keeps a gazetteer of the extract's
+# cities and towns, so get_coordinates can place a city without the online geocoder.
+
+DEFAULT_PLACE_TYPES = ("tourism=hotel", "amenity=restaurant", "tourism=attraction")
+GAZETTEER_PLACES = ("city", "town")  # OSM place=* values kept in the gazetteer, most important first
+GAZETTEER_NAME_TAGS = ("name", "name:en", "int_name")  # "Roma" and "Rome" both find the same node
+CELL_SIZE = 0.1  # Grid cell size in degrees (~11 km north-south)
+EARTH_RADIUS_M = 6371000.0
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+# Function to compute great-circle distances (metres) from one point to arrays of points
+def haversine(lat, lon, lats, lons):
+    lat1, lon1 = math.radians(lat), math.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+# Function to read (id, lat, lon, tags) for every node in an OSM XML extract
+def iter_osm_xml_nodes(path):
+    for _, elem in ET.iterparse(path, events=("end",)):
+        if elem.tag == "node":
+            tags = {tag.get("k"): tag.get("v") for tag in elem.iter("tag")}
+            if tags:
+                yield int(elem.get("id")), float(elem.get("lat")), float(elem.get("lon")), tags
+            elem.clear()
+        elif elem.tag in ("way", "relation"):
+            elem.clear()
+
+
+# Function to read nodes from an OSM PBF extract (needs the optional `osmium` package)
+def iter_osm_pbf_nodes(path):
+    try:
+        import osmium
+    except ImportError as e:
+        raise ImportError("Reading .pbf extracts requires `pip install osmium`; or convert to .osm XML.") from e
+
+    for node in osmium.FileProcessor(path, osmium.osm.NODE):
+        if len(node.tags):
+            yield node.id, node.location.lat, node.location.lon, {tag.k: tag.v for tag in node.tags}
+
+
+# Per-category arrays sorted by grid cell; names are kept as one UTF-8 blob plus offsets
+class CategoryIndex:
+    def __init__(self, cells, lat, lon, ids, name_blob, name_offsets):
+        self.cells = cells
+        self.lat = lat
+        self.lon = lon
+        self.ids = ids
+        self.name_blob = name_blob
+        self.name_offsets = name_offsets
+
+    @classmethod
+    def build(cls, rows, cell_size):
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        lat = np.array([row[1] for row in rows], dtype=np.float64)
+        lon = np.array([row[2] for row in rows], dtype=np.float64)
+        cells = cell_keys(lat, lon, cell_size)
+        order = np.argsort(cells, kind="stable")
+
+        encoded = [rows[i][3].encode("utf-8") for i in order]
+        name_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        name_offsets[1:] = np.cumsum([len(name) for name in encoded])
+        name_blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(cells[order], lat[order], lon[order], ids[order], name_blob, name_offsets)
+
+    def name(self, i):
+        return self.name_blob[self.name_offsets[i]:self.name_offsets[i + 1]].tobytes().decode("utf-8")
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# Function to rank a place node for the gazetteer: cities before towns, then by population,
+# so a name shared by several places resolves to the most prominent one
+def gazetteer_rank(tags):
+    try:
+        population = int(tags.get("population", "0").replace(",", "").replace(" ", ""))
+    except ValueError:
+        population = 0
+    return -GAZETTEER_PLACES.index(tags["place"]), population
+
+
+# Function to map coordinates to integer grid cell keys (row-major, rows by latitude)
+def cell_keys(lat, lon, cell_size):
+    columns = int(math.ceil(360 / cell_size))
+    cy = np.floor((np.asarray(lat) + 90) / cell_size).astype(np.int64)
+    cx = np.floor((np.asarray(lon) + 180) / cell_size).astype(np.int64) % columns
+    return cy * columns + cx
+
+
+class POIIndex:
+    def __init__(self, categories, cell_size=CELL_SIZE, gazetteer=None):
+        self.categories = categories
+        self.cell_size = cell_size
+        self.columns = int(math.ceil(360 / cell_size))
+        self.gazetteer = gazetteer or {}  # normalize_city(name) -> (lat, lon)
+
+    # Function to build the index from an OSM extract, keeping only the given place types
+    @classmethod
+    def from_osm(cls, path, place_types=DEFAULT_PLACE_TYPES, cell_size=CELL_SIZE):
+        wanted = {}
+        for place_type in place_types:
+            key, value = place_type.split("=", 1)
+            wanted.setdefault(key, {})[value] = place_type
+
+        nodes = iter_osm_pbf_nodes(path) if path.endswith(".pbf") else iter_osm_xml_nodes(path)
+        rows = {place_type: [] for place_type in place_types}
+        places = {}  # normalized name -> (rank, lat, lon)
+        for node_id, lat, lon, tags in nodes:
+            for key, values in wanted.items():
+                place_type = values.get(tags.get(key))
+                if place_type is not None:
+                    rows[place_type].append((node_id, lat, lon, tags.get("name", "")))
+            if tags.get("place") in GAZETTEER_PLACES:
+                rank = gazetteer_rank(tags)
+                for name in {normalize_city(tags[tag]) for tag in GAZETTEER_NAME_TAGS if tags.get(tag)}:
+                    if name not in places or rank > places[name][0]:
+                        places[name] = (rank, lat, lon)
+
+        categories = {place_type: CategoryIndex.build(category_rows, cell_size) for place_type, category_rows in rows.items()}
+        return cls(categories, cell_size, {name: (lat, lon) for name, (_, lat, lon) in places.items()})
+
+    def save(self, path):
+        arrays = {"cell_size": np.array(self.cell_size)}
+        for i, (place_type, category) in enumerate(self.categories.items()):
+            arrays[f"c{i}_place_type"] = np.frombuffer(place_type.encode("utf-8"), dtype=np.uint8)
+            for field in ("cells", "lat", "lon", "ids", "name_blob", "name_offsets"):
+                arrays[f"c{i}_{field}"] = getattr(category, field)
+
+        names = list(self.gazetteer)
+        encoded = [name.encode("utf-8") for name in names]
+        arrays["gazetteer_name_offsets"] = np.zeros(len(encoded) + 1, dtype=np.int64)
+        arrays["gazetteer_name_offsets"][1:] = np.cumsum([len(name) for name in encoded])
+        arrays["gazetteer_name_blob"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        arrays["gazetteer_lat"] = np.array([self.gazetteer[name][0] for name in names], dtype=np.float64)
+        arrays["gazetteer_lon"] = np.array([self.gazetteer[name][1] for name in names], dtype=np.float64)
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            categories = {}
+            i = 0
+            while f"c{i}_place_type" in data:
+                place_type = data[f"c{i}_place_type"].tobytes().decode("utf-8")
+                categories[place_type] = CategoryIndex(
+                    *(data[f"c{i}_{field}"] for field in ("cells", "lat", "lon", "ids", "name_blob", "name_offsets"))
+                )
+                i += 1
+
+            # Indexes built before the gazetteer existed have none; their cities are geocoded online
+            gazetteer = {}
+            if "gazetteer_lat" in data:
+                blob, offsets = data["gazetteer_name_blob"].tobytes(), data["gazetteer_name_offsets"]
+                names = [blob[offsets[j]:offsets[j + 1]].decode("utf-8") for j in range(len(offsets) - 1)]
+                gazetteer = dict(zip(names, zip(data["gazetteer_lat"].tolist(), data["gazetteer_lon"].tolist())))
+            return cls(categories, float(data["cell_size"]), gazetteer)
+
+    def has(self, place_type):
+        return place_type in self.categories
+
+    # Function to look a city up in the gazetteer; returns (lat, lon), or None if the extract doesn't have it
+    def locate(self, city):
+        return self.gazetteer.get(normalize_city(city))
+
+    # Function to list the (start, end) cell-key ranges covering a circle around a point
+    def _cell_ranges(self, lat, lon, radius):
+        dlat = math.degrees(radius / EARTH_RADIUS_M)
+        cos_lat = max(math.cos(math.radians(min(abs(lat) + dlat, 90.0))), 1e-6)
+        dlon = min(math.degrees(radius / (EARTH_RADIUS_M * cos_lat)), 180.0)
+
+        row_min = int(math.floor((max(lat - dlat, -90.0) + 90) / self.cell_size))
+        row_max = int(math.floor((min(lat + dlat, 90.0) + 90) / self.cell_size))
+        col_min = int(math.floor((lon - dlon + 180) / self.cell_size))
+        col_max = int(math.floor((lon + dlon + 180) / self.cell_size))
+
+        if col_max - col_min + 1 >= self.columns:
+            col_spans = [(0, self.columns - 1)]
+        elif col_min < 0:
+            col_spans = [(0, col_max), (col_min % self.columns, self.columns - 1)]
+        elif col_max >= self.columns:
+            col_spans = [(col_min, self.columns - 1), (0, col_max % self.columns)]
+        else:
+            col_spans = [(col_min, col_max)]
+
+        return [
+            (row * self.columns + start, row * self.columns + end)
+            for row in range(row_min, row_max + 1)
+            for start, end in col_spans
+        ]
+
+    # Function to find nodes of a place type within `radius` metres, nearest first.
+    # Returns Overpass-style elements so callers can treat both backends the same way.
+    def query_radius(self, place_type, lat, lon, radius, limit=None):
+        category = self.categories.get(place_type)
+        if category is None or not len(category):
+            return []
+
+        ranges = np.array(self._cell_ranges(lat, lon, radius), dtype=np.int64)
+        starts = np.searchsorted(category.cells, ranges[:, 0], side="left")
+        ends = np.searchsorted(category.cells, ranges[:, 1], side="right")
+        candidates = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends) if e > s] or [np.empty(0, np.int64)])
+        if not len(candidates):
+            return []
+
+        distances = haversine(lat, lon, category.lat[candidates], category.lon[candidates])
+        inside = distances <= radius
+        candidates, distances = candidates[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        if limit is not None:
+            order = order[:limit]
+
+        return [self._element(place_type, category, candidates[i], distances[i]) for i in order]
+
+    # Function to find the k nearest nodes of a place type, widening the search as needed
+    def nearest(self, place_type, lat, lon, k, initial_radius=5000, max_radius=EARTH_RADIUS_M * math.pi):
+        category = self.categories.get(place_type)
+        if category is None or not len(category):
+            return []
+
+        radius = initial_radius
+        while True:
+            found = self.query_radius(place_type, lat, lon, radius, limit=k)
+            if len(found) >= min(k, len(category)) or radius >= max_radius:
+                return found
+            radius = min(radius * 4, max_radius)
+
+    def _element(self, place_type, category, i, distance):
+        key, value = place_type.split("=", 1)
+        tags = {key: value}
+        name = category.name(i)
+        if name:
+            tags["name"] = name
+        return {
+            "type": "node",
+            "id": int(category.ids[i]),
+            "lat": float(category.lat[i]),
+            "lon": float(category.lon[i]),
+            "distance": float(distance),
+            "tags": tags,
+        }
+
+
+# Function to load an index once per process and share it between sessions
+def load_poi_index(path):
+    with _loaded_lock:
+        if path not in _loaded:
+            _loaded[path] = POIIndex.load(path)
+        return _loaded[path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an offline POI index from an OSM extract.")
+    parser.add_argument("extract", help="OSM extract (.osm XML or .pbf)")
+    parser.add_argument("output", help="Index file to write (.npz)")
+    parser.add_argument("--place-type", action="append", dest="place_types",
+                        help="key=value tag to index (repeatable); defaults to hotels, restaurants and attractions")
+    parser.add_argument("--cell-size", type=float, default=CELL_SIZE, help="Grid cell size in degrees")
+    args = parser.parse_args()
+
+    index = POIIndex.from_osm(args.extract, args.place_types or DEFAULT_PLACE_TYPES, args.cell_size)
+    index.save(args.output)
+    for place_type, category in index.categories.items():
+        print(f"{place_type}: {len(category)} places")
+    print(f"gazetteer: {len(index.gazetteer)} city and town names")
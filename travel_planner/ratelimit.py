@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+
+from . import metrics
+
+# Token-bucket rate limiting for upstream APIs. One bucket per host is shared by
+# every thread in the process (see http_client.set_rate_limits), so a batch job
+# with many workers still stays under each provider's quota.
+#
+# LLM providers also get an AdaptiveLimiter per model: an AIMD concurrency limit
+# that grows by about one slot per round of successful calls and halves when the
+# provider answers 429/503 or the call fails in transport, so throughput climbs
+# to the quota without a storm of rejected calls. A slow answer is not overload by
+# default: long generations routinely take tens of seconds.
+ADAPTIVE_INITIAL_CONCURRENCY = int(os.environ.get("ADAPTIVE_INITIAL_CONCURRENCY", 4))
+ADAPTIVE_MAX_CONCURRENCY = int(os.environ.get("ADAPTIVE_MAX_CONCURRENCY", 32))
+ADAPTIVE_LATENCY_TARGET = float(os.environ.get("ADAPTIVE_LATENCY_TARGET", 0))  # Seconds; opt-in, slower answers count as overload (0 disables)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)  # Tokens added per second
+        self.capacity = float(burst if burst is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # Take tokens if they are available right now
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    # Take tokens, sleeping until they are available. Callers reserve their place by
+    # taking the tokens up front (the balance may go negative), so waiters are served
+    # in arrival order. Returns False, without taking anything, if the wait would
+    # exceed `timeout` seconds.
+    def acquire(self, tokens=1, timeout=None):
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= tokens
+        if wait:
+            time.sleep(wait)
+        return True
+
+
+class AdaptiveLimiter:
+    def __init__(self, name, initial=ADAPTIVE_INITIAL_CONCURRENCY, minimum=1, maximum=ADAPTIVE_MAX_CONCURRENCY,
+                 latency_target=ADAPTIVE_LATENCY_TARGET, decrease_factor=0.5):
+        self.name = name
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.in_flight = 0
+        self._paused_until = 0.0  # Set from Retry-After: no new calls before this time
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    # Wait for a free slot. Returns False, without taking one, if none frees up before
+    # `deadline` (a time.monotonic() value), or straight away if a Retry-After pause
+    # outlasts the deadline.
+    def acquire(self, deadline=None):
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if now >= self._paused_until and self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return True
+                wake = self._paused_until if now < self._paused_until else None
+                if deadline is not None:
+                    if now >= deadline or (wake is not None and wake >= deadline):
+                        metrics.inc("limiter_timeouts", limiter=self.name)
+                        return False
+                    wake = deadline if wake is None else min(wake, deadline)
+                self._cond.wait(None if wake is None else wake - now)
+
+    # Give a slot back with the call's outcome. `started` is when the call was sent: calls
+    # sent before the last decrease don't decrease again, so one burst of 429s halves once.
+    def release(self, started, latency=None, overloaded=False, retry_after=None):
+        with self._cond:
+            at_limit = self.in_flight >= int(self.limit)
+            self.in_flight -= 1
+            now = time.monotonic()
+            if self.latency_target and latency is not None and latency > self.latency_target:
+                overloaded = True
+            if overloaded:
+                if started >= self._last_decrease:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+                    metrics.inc("limiter_decreases", limiter=self.name)
+            elif at_limit:
+                # Only grow when the limit was actually what held calls back
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            self._cond.notify_all()
+
+    def state(self):
+        with self._cond:
+            return {"limit": round(self.limit, 2), "in_flight": self.in_flight}
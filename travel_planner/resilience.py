@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+
+# Circuit breakers for upstream endpoints. After `failure_threshold` consecutive
+# failures (timeouts, connection errors, 5xx/429) an endpoint is skipped for
+# `reset_timeout` seconds instead of making every caller wait out its timeout;
+# then one probe request is let through, and a success closes the circuit again.
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("BREAKER_FAILURE_THRESHOLD", 3))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("BREAKER_RESET_TIMEOUT", 30))
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "open" if time.monotonic() - self._opened_at < self.reset_timeout else "half-open"
+
+    # Whether a request may go to this endpoint now. Once the circuit has been open for
+    # reset_timeout, one caller gets through as a probe and the timer restarts, so a
+    # probe that never reports back only delays the next one.
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self._opened_at = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+# Function to get the shared breaker for an endpoint (e.g. an Overpass mirror URL), creating it on first use
+def get_breaker(name):
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+# Function to report every endpoint's circuit state, e.g. {"https://overpass.kumi.systems/api/interpreter": "open"}
+def breaker_states():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.state for breaker in breakers}
+
+
+# Function to close every circuit, e.g. between benchmark runs
+def reset_breakers():
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    for breaker in breakers:
+        breaker.record_success()
@@ -0,0 +1,133 @@
+import math
+
+import numpy as np
+
+# Distance-aware itinerary scheduling: cluster attractions into one compact group
+# per day, then order each day's stops with nearest neighbour + 2-opt.
+
+EARTH_RADIUS_KM = 6371.0
+
+
+# Function to project lat/lon onto a local flat plane in km (fine at city scale)
+def project(lats, lons):
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    lat0 = math.radians(float(np.mean(lats)))
+    x = np.radians(lons) * EARTH_RADIUS_KM * math.cos(lat0)
+    y = np.radians(lats) * EARTH_RADIUS_KM
+    return np.column_stack([x, y])
+
+
+# Function to compute the pairwise Euclidean distance matrix between two point sets
+def distance_matrix(a, b):
+    diff = a[:, None, :] - b[None, :, :]
+    return np.sqrt((diff ** 2).sum(axis=-1))
+
+
+# Function to run k-means (k-means++ seeding, fixed seed so itineraries are reproducible)
+def kmeans(points, k, iterations=25, seed=0):
+    rng = np.random.default_rng(seed)
+    centroids = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        closest = distance_matrix(points, np.array(centroids)).min(axis=1) ** 2
+        total = closest.sum()
+        if total == 0:
+            centroids.append(points[rng.integers(len(points))])
+        else:
+            centroids.append(points[rng.choice(len(points), p=closest / total)])
+    centroids = np.array(centroids)
+
+    for _ in range(iterations):
+        labels = distance_matrix(points, centroids).argmin(axis=1)
+        updated = np.array([
+            points[labels == c].mean(axis=0) if np.any(labels == c) else centroids[c]
+            for c in range(k)
+        ])
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+    return centroids
+
+
+# Function to assign points to centroids with at most `capacity` points each.
+# Closest (point, centroid) pairs are taken first; points that don't fit are left out.
+def capacitated_assign(points, centroids, capacity):
+    distances = distance_matrix(points, centroids)
+    order = np.argsort(distances, axis=None, kind="stable")
+    point_ids, cluster_ids = np.unravel_index(order, distances.shape)
+
+    groups = [[] for _ in range(len(centroids))]
+    assigned = np.zeros(len(points), dtype=bool)
+    remaining = min(len(points), capacity * len(centroids))
+    for p, c in zip(point_ids, cluster_ids):
+        if assigned[p] or len(groups[c]) >= capacity:
+            continue
+        groups[c].append(int(p))
+        assigned[p] = True
+        remaining -= 1
+        if remaining == 0:
+            break
+    return groups
+
+
+# Function to order stops as an open path: nearest neighbour tour improved by 2-opt
+def order_stops(points, start=0):
+    n = len(points)
+    if n <= 2:
+        return list(range(n))
+
+    dist = distance_matrix(points, points)
+    path = [start]
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start] = False
+    for _ in range(n - 1):
+        candidates = np.where(unvisited, dist[path[-1]], np.inf)
+        nxt = int(candidates.argmin())
+        path.append(nxt)
+        unvisited[nxt] = False
+    path = np.array(path)
+
+    # 2-opt: reversing path[i+1..j] swaps edges (i, i+1) and (j, j+1); the last stop has no outgoing edge
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 2):
+            a, b = path[i], path[i + 1]
+            c = path[i + 2:]
+            d = np.append(path[i + 3:], -1)
+            removed = dist[a, b] + np.where(d >= 0, dist[c, d], 0)
+            added = dist[a, c] + np.where(d >= 0, dist[b, d], 0)
+            gain = removed - added
+            j = int(gain.argmax())
+            if gain[j] > 1e-9:
+                path[i + 1:i + 3 + j] = path[i + 1:i + 3 + j][::-1]
+                improved = True
+    return [int(p) for p in path]
+
+
+# Function to split attractions into per-day stop lists (indices into lats/lons).
+# Days are ordered by a nearest-neighbour walk over their centres, starting near
+# the middle of all attractions, and stops within a day form a short walking path.
+def plan_days(lats, lons, days, per_day=3):
+    n = len(lats)
+    if n == 0 or days <= 0:
+        return [[] for _ in range(max(days, 0))]
+
+    points = project(lats, lons)
+    k = min(days, math.ceil(n / per_day))
+    centroids = kmeans(points, k)
+    groups = [group for group in capacitated_assign(points, centroids, per_day) if group]
+
+    centres = np.array([points[group].mean(axis=0) for group in groups])
+    hub = int(distance_matrix(centres, points.mean(axis=0, keepdims=True))[:, 0].argmin())
+    day_order = order_stops(centres, start=hub)
+
+    plan = []
+    for g in day_order:
+        group = np.array(groups[g])
+        local = points[group]
+        first = int(distance_matrix(local, centres[g:g + 1])[:, 0].argmax())  # Start at the edge, sweep across
+        plan.append([int(group[i]) for i in order_stops(local, start=first)])
+
+    plan.extend([] for _ in range(days - len(plan)))
+    return plan
@@ -0,0 +1,80 @@
+import functools
+import json
+import threading
+
+# Request coalescing: concurrent calls with the same key share one upstream call.
+# The first caller (the leader) runs the function; everyone else who arrives while
+# it is in flight waits for and receives the same result, or the same exception.
+# Results are shared between callers, so they must not be mutated.
+
+
+class SingleFlightTimeout(TimeoutError):
+    pass
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn, *args, timeout=None, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+            finally:
+                # Forget the call before waking waiters, so later callers start a fresh one
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(timeout):
+            raise SingleFlightTimeout(f"Timed out after {timeout}s waiting for in-flight call {key!r}")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
+
+
+# Process-wide group shared by every Streamlit session
+default_group = SingleFlight()
+
+
+# Function to build a key from arbitrary call arguments
+def default_key(*args, **kwargs):
+    return json.dumps([args, kwargs], sort_keys=True, default=repr)
+
+
+# Decorator that coalesces identical concurrent calls. `key` maps the call's
+# arguments to a normalized key (e.g. normalize_city for city names); waiters give
+# up with SingleFlightTimeout after `timeout` seconds if one is set.
+def singleflight(key=None, timeout=None, group=None):
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            call_key = (name, (key or default_key)(*args, **kwargs))
+            # Bind the arguments first, so the wrapped function may take its own `timeout`
+            return (group or default_group).do(call_key, functools.partial(fn, *args, **kwargs), timeout=timeout)
+
+        return wrapper
+
+    return decorator
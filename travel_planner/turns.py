@@ -0,0 +1,36 @@
+from collections import deque
+
+# Idempotent turn processing for chat front ends that rerun top to bottom
+# (Streamlit). Each submitted message becomes a turn with its own id and is queued
+# exactly once, from the input's on_submit callback; the script then answers
+# pending turns. Model calls are memoized per (turn, step), so a rerun that lands
+# while a turn is half processed reuses what already finished instead of calling
+# the model again, and reruns with no new input do no work at all.
+
+
+class TurnLog:
+    def __init__(self):
+        self.next_id = 1
+        self.pending = deque()  # Turns submitted but not yet answered, oldest first
+        self.results = {}  # (turn id, step) -> memoized result, dropped once the turn completes
+
+    # Function to queue a new user message; returns the turn
+    def submit(self, text):
+        turn = {"id": self.next_id, "text": text, "recorded": False}
+        self.next_id += 1
+        self.pending.append(turn)
+        return turn
+
+    # Function to run `fn(*args, **kwargs)` once for this turn and step, returning the stored result on repeats
+    def memo(self, turn, step, fn, *args, **kwargs):
+        key = (turn["id"], step)
+        if key not in self.results:
+            self.results[key] = fn(*args, **kwargs)
+        return self.results[key]
+
+    # Function to mark the oldest pending turn answered and forget its memoized results
+    def complete(self, turn):
+        if self.pending and self.pending[0]["id"] == turn["id"]:
+            self.pending.popleft()
+        for key in [key for key in self.results if key[0] == turn["id"]]:
+            del self.results[key]